@@ -0,0 +1,98 @@
+import calendar
+import json
+import sqlite3
+from datetime import datetime
+
+from strava_export.activity_fetcher import fetch_all_activities
+
+cache_filename = "strava_cache.sqlite"
+
+
+def start_epoch(activity):
+    """Returns the activity's start_date as a UTC epoch timestamp, or 0 if it has none."""
+    start_date = activity.get("start_date")
+    if not start_date:
+        return 0
+    return calendar.timegm(datetime.strptime(start_date, "%Y-%m-%dT%H:%M:%SZ").timetuple())
+
+
+class ActivityCache:
+    """Local SQLite store of raw activity JSON, keyed by Strava activity id."""
+
+    def __init__(self, filename=cache_filename):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS activities ("
+            " id INTEGER PRIMARY KEY,"
+            " start_epoch INTEGER NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_activities_start ON activities (start_epoch)")
+        # Decoded summary polylines: float32 (lat, lon) pairs, plus a checksum of the encoded
+        # polyline so a route edited on Strava (e.g. a cropped activity) is decoded again
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS routes ("
+            " id INTEGER PRIMARY KEY,"
+            " checksum INTEGER NOT NULL,"
+            " points BLOB NOT NULL)"
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM activities").fetchone()[0]
+
+    def latest_start_epoch(self):
+        """Returns the start time of the newest cached activity, or None if the cache is empty."""
+        return self.conn.execute("SELECT MAX(start_epoch) FROM activities").fetchone()[0]
+
+    def activities_key(self):
+        """
+        Returns (activity count, newest start time), which changes whenever an
+        incremental sync adds activities. Writes to the routes table leave it alone.
+        """
+        return tuple(self.conn.execute("SELECT COUNT(*), MAX(start_epoch) FROM activities").fetchone())
+
+    def upsert(self, activities):
+        """Inserts new activities and replaces cached copies of ones already seen."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO activities (id, start_epoch, data) VALUES (?, ?, ?)",
+                ((a["id"], start_epoch(a), json.dumps(a)) for a in activities)
+            )
+
+    def all_activities(self):
+        """Returns every cached activity, newest first (the order the Strava API uses)."""
+        rows = self.conn.execute("SELECT data FROM activities ORDER BY start_epoch DESC, id DESC")
+        return [json.loads(data) for (data,) in rows]
+
+    def cached_routes(self):
+        """Returns {activity id: (checksum, points blob)} for every cached route."""
+        return {id_: (checksum, points) for id_, checksum, points in
+                self.conn.execute("SELECT id, checksum, points FROM routes")}
+
+    def store_routes(self, rows):
+        """Stores (activity id, checksum, points blob) rows, replacing older copies."""
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO routes (id, checksum, points) VALUES (?, ?, ?)", rows)
+
+
+def sync_activities(session, cache, full=False, **fetch_options):
+    """
+    Brings the cache up to date and returns all cached activities.
+    Only activities that started after the newest cached one are fetched,
+    unless the cache is empty or full=True.
+    """
+    after = None if full else cache.latest_start_epoch()
+    params = None
+    if after is not None:
+        params = {'after': after}
+        # New activities usually fit in one page, so don't prefetch ahead
+        fetch_options.setdefault('window', 1)
+    new_activities = fetch_all_activities(session, params=params, **fetch_options)
+    cache.upsert(new_activities)
+    print(f"Fetched {len(new_activities)} new activities ({len(cache)} cached in total).")
+    return cache.all_activities()
@@ -0,0 +1,65 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+activities_url = "https://www.strava.com/api/v3/athlete/activities"
+
+
+def make_session(access_token, pool_size=8):
+    """Returns a requests.Session that keeps up to pool_size connections alive for reuse."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers['Authorization'] = 'Bearer ' + access_token
+    return session
+
+
+def fetch_page(session, page, url=activities_url, per_page=200, params=None):
+    """Fetches one page of activities. Returns the response object."""
+    param = {'per_page': per_page, 'page': page}
+    if params:
+        param.update(params)
+    return session.get(url, params=param)
+
+
+def fetch_all_activities(session, url=activities_url, per_page=200, window=4, params=None):
+    """
+    Fetches every page of activities, keeping up to `window` page requests in flight.
+    Pages are consumed in order; fetching stops at the first empty or short page.
+    An error response raises requests.HTTPError rather than returning a truncated list;
+    wrap the session in a RateLimitedSession to retry transient errors first.
+    """
+    all_activities = []
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        pending = deque()
+        next_page = 1
+        for _ in range(window):
+            pending.append(executor.submit(fetch_page, session, next_page, url, per_page, params))
+            next_page += 1
+
+        while pending:
+            response = pending.popleft().result()
+            if response.status_code != 200:
+                print(f"Error: {response.status_code}, {response.text}")
+                for future in pending:
+                    future.cancel()
+                response.raise_for_status()
+                raise requests.HTTPError(f"Unexpected status {response.status_code}", response=response)
+            my_dataset = response.json()
+            if not my_dataset:
+                print("No more activities found, stopping fetch.")
+                break
+            all_activities.extend(my_dataset)
+            if len(my_dataset) < per_page:
+                # A short page is the last one; no need to ask for an empty page
+                break
+            pending.append(executor.submit(fetch_page, session, next_page, url, per_page, params))
+            next_page += 1
+
+        # Requests already sent past the last page are simply discarded
+        for future in pending:
+            future.cancel()
+    return all_activities
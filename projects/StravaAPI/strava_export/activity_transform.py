@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+meters_to_miles = 0.000621371
+
+# Fields pulled out of the raw activity JSON, with the value used when one is missing
+activity_fields = {
+    "id": None,
+    "name": "Unnamed Activity",
+    "type": "Unknown",
+    "start_date": None,
+    "moving_time": 0,
+    "kudos_count": 0,
+    "distance": 0.0,
+}
+
+
+def normalize_activities(activities):
+    """
+    Builds a DataFrame with one column per entry of activity_fields, plus a parsed
+    UTC "start" column and the nested map.summary_polyline as "summary_polyline"
+    ("" when the activity has none).
+    Only the needed fields are read: pd.json_normalize flattens every nested
+    field of every activity and is several times slower on large histories.
+    """
+    columns = {
+        field: [activity.get(field, default) for activity in activities]
+        for field, default in activity_fields.items()
+    }
+    columns["summary_polyline"] = [(activity.get("map") or {}).get("summary_polyline") for activity in activities]
+    df = pd.DataFrame(columns)
+    # An empty history would otherwise give float columns that the .str accessor rejects
+    for field in ("name", "type", "start_date", "summary_polyline"):
+        df[field] = df[field].astype(object)
+    for field in ("name", "type"):
+        df[field] = df[field].fillna(activity_fields[field])
+    # Manual activities have no map; an empty polyline keeps the column all strings
+    df["summary_polyline"] = df["summary_polyline"].fillna("")
+    for field in ("moving_time", "kudos_count", "distance"):
+        df[field] = pd.to_numeric(df[field], errors="coerce").fillna(0)
+    df["moving_time"] = df["moving_time"].astype(np.int64)
+    df["kudos_count"] = df["kudos_count"].astype(np.int64)
+    df["start"] = pd.to_datetime(df["start_date"], format="ISO8601", utc=True, errors="coerce")
+    return df
+
+
+def format_durations(seconds):
+    """Formats a Series of second counts as HH:MM:SS strings."""
+    hours, remainder = np.divmod(seconds.to_numpy(dtype=np.int64), 3600)
+    minutes, secs = np.divmod(remainder, 60)
+    # The divisions are vectorized; a single format call per value beats three str.zfill passes
+    formatted = [f"{h:02}:{m:02}:{s:02}" for h, m, s in zip(hours.tolist(), minutes.tolist(), secs.tolist())]
+    return pd.Series(formatted, index=seconds.index, dtype=object)
+
+
+def build_frames(activities):
+    """
+    Turns raw activities (newest first) into the frames the exports are built from:
+      "normalized" - the output of normalize_activities
+      "activities" - one display row per activity
+      "totals"     - total kudos and active time
+      "monthly"    - kudos, activity count, distance and moving time per month, oldest first
+    """
+    df = normalize_activities(activities)
+    distance_miles = df["distance"] * meters_to_miles
+    # start_date is ISO 8601, so the day and month are prefixes of the already validated string;
+    # slicing is far cheaper than dt.strftime
+    dated = df["start"].notna()
+    day = df["start_date"].where(dated).str.slice(0, 10)
+
+    df_activities = pd.DataFrame({
+        "Activity Number": np.arange(1, len(df) + 1),
+        "Activity Name": df["name"],
+        "Activity Type": df["type"],
+        "Date": day.fillna("N/A"),
+        "Active Time": format_durations(df["moving_time"]),
+        "Kudos": df["kudos_count"],
+        "Distance (miles)": distance_miles.round(2),
+    })
+
+    total_time = format_durations(pd.Series([df["moving_time"].sum()])).iloc[0]
+    df_totals = pd.DataFrame(
+        [["Total Kudos", int(df["kudos_count"].sum())], ["Total Active Time", total_time]],
+        columns=["DataType", "Values"]
+    )
+
+    # Activities without a start date are left out of the monthly figures
+    df_monthly = (
+        df.assign(distance_miles=distance_miles, moving_hours=df["moving_time"] / 3600)
+        .loc[dated]
+        .groupby(day[dated].str.slice(0, 7))
+        .agg(**{
+            "Kudos": ("kudos_count", "sum"),
+            "Activities": ("kudos_count", "size"),
+            "Distance (miles)": ("distance_miles", "sum"),
+            "Moving Time (hours)": ("moving_hours", "sum"),
+        })
+        .round(2)
+        .rename_axis("Month")
+        .reset_index()
+    )
+
+    return {
+        "normalized": df,
+        "activities": df_activities,
+        "totals": df_totals,
+        "monthly": df_monthly,
+    }
@@ -0,0 +1,75 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.chart import LineChart, Reference
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+excel_filename = "Strava_Activities.xlsx"
+
+
+def column_widths(df, padding=0):
+    """Returns the width of each column: its longest value or header, as a string, plus padding."""
+    widths = []
+    for column in df.columns:
+        longest = df[column].astype(str).str.len().max() if len(df) else 0
+        widths.append(max(int(longest), len(str(column))) + padding)
+    return widths
+
+
+def write_sheet(wb, title, df, padding=0):
+    """
+    Streams a DataFrame into a new write-only sheet: bold header row, then one row per record.
+    Column widths have to be set before the first row is written.
+    """
+    ws = wb.create_sheet(title=title)
+    for index, width in enumerate(column_widths(df, padding), start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+    header = []
+    for name in df.columns:
+        cell = WriteOnlyCell(ws, value=str(name))
+        cell.font = Font(bold=True)
+        header.append(cell)
+    ws.append(header)
+    for row in df.itertuples(index=False, name=None):
+        ws.append(row)
+    return ws
+
+
+def add_line_chart(ws, rows, title, y_title, anchor, max_col=2):
+    """Charts columns 2..max_col of a sheet against the months in column 1."""
+    chart = LineChart()
+    chart.title = title
+    chart.x_axis.title = "Month"
+    chart.y_axis.title = y_title
+    data = Reference(ws, min_col=2, min_row=1, max_col=max_col, max_row=rows + 1)
+    categories = Reference(ws, min_col=1, min_row=2, max_row=rows + 1)
+    chart.add_data(data, titles_from_data=True)
+    chart.set_categories(categories)
+    ws.add_chart(chart, anchor)
+
+
+def write_workbook(frames, file_name=excel_filename):
+    """
+    Writes the frames from activity_transform.build_frames to an Excel workbook in one pass.
+    The workbook is opened in write-only mode, so rows are streamed to disk as they are
+    appended instead of being held in memory, and the file is never re-opened to size
+    columns or add charts.
+    """
+    monthly = frames["monthly"]
+    months = len(monthly)
+    wb = Workbook(write_only=True)
+
+    write_sheet(wb, "Activities", frames["activities"], padding=2)
+    write_sheet(wb, "Summary", frames["totals"])
+
+    ws_kudos = write_sheet(wb, "Kudos Per Month", monthly[["Month", "Kudos"]])
+    add_line_chart(ws_kudos, months, "Kudos Over Time", "Kudos", "D2")
+
+    ws_activities = write_sheet(wb, "Activities Per Month", monthly[["Month", "Activities"]])
+    add_line_chart(ws_activities, months, "Activities Per Month", "Number of Activities", "D2")
+
+    ws_combined = write_sheet(wb, "Kudos vc Activities", monthly[["Month", "Kudos", "Activities"]])
+    add_line_chart(ws_combined, months, "Kudos vs Activities Per Month", "Count", "E2", max_col=3)
+
+    wb.save(file_name)
+    return file_name
@@ -0,0 +1,165 @@
+import math
+
+import folium
+import numpy as np
+import polyline
+from folium.plugins import HeatMap
+
+map_filename = "strava_activities_map.html"
+
+layer_colors = ["red", "blue", "green", "purple", "orange", "darkred", "cadetblue", "black"]
+
+# Web Mercator ground resolution at the equator for zoom 0, in meters per pixel
+equator_meters_per_pixel = 156543.03392
+meters_per_degree = 111320.0
+
+
+def decode_routes(df):
+    """
+    Decodes the summary polylines of a normalized activity frame.
+    Returns a list of (activity type, N x 2 array of (lat, lon)) for the activities that have a route.
+    """
+    routes = []
+    for activity_type, encoded in zip(df["type"], df["summary_polyline"]):
+        if encoded:
+            routes.append((activity_type, np.array(polyline.decode(encoded), dtype=np.float64)))
+    return routes
+
+
+def zoom_tolerance(zoom, latitude, pixels=1.0):
+    """Returns the simplification tolerance in degrees that is `pixels` screen pixels wide at a zoom level."""
+    meters_per_pixel = equator_meters_per_pixel * math.cos(math.radians(latitude)) / 2 ** zoom
+    return pixels * meters_per_pixel / meters_per_degree
+
+
+def simplify(points, tolerance):
+    """
+    Douglas-Peucker simplification of an N x 2 array of (lat, lon) points.
+    Longitudes are scaled by cos(latitude) so the tolerance is the same in both directions.
+    Uses an explicit stack, so very long routes cannot hit the recursion limit.
+    """
+    n = len(points)
+    if n < 3:
+        return points
+    xy = np.column_stack((points[:, 1] * math.cos(math.radians(points[0, 0])), points[:, 0]))
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = xy[first], xy[last]
+        segment = end - start
+        length = math.hypot(segment[0], segment[1])
+        offsets = xy[first + 1:last] - start
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return points[keep]
+
+
+def merge_routes(routes, tolerance):
+    """
+    Merges routes into one MultiLineString per activity type.
+    Points are first snapped to a grid of the tolerance's size, so repeats of the same route
+    trace the same cells; segments already drawn by an earlier route of the same type are
+    dropped, and whatever is new is then simplified.
+    Returns {activity type: list of lines, each a list of [lon, lat] pairs}.
+    """
+    layers = {}
+    seen_by_type = {}
+    for activity_type, points in routes:
+        cells = np.round(points / tolerance).astype(np.int64)
+        # Drop runs of points that fall in the same cell
+        moved = np.ones(len(cells), dtype=bool)
+        moved[1:] = np.any(cells[1:] != cells[:-1], axis=1)
+        cells = cells[moved]
+        lines = layers.setdefault(activity_type, [])
+        seen = seen_by_type.setdefault(activity_type, set())
+        current = []
+        for a, b in zip(map(tuple, cells[:-1].tolist()), map(tuple, cells[1:].tolist())):
+            if (a, b) in seen or (b, a) in seen:
+                # Already drawn: finish the new stretch so far
+                if len(current) > 1:
+                    lines.append(current)
+                current = []
+                continue
+            seen.add((a, b))
+            if not current:
+                current.append(a)
+            current.append(b)
+        if len(current) > 1:
+            lines.append(current)
+
+    merged = {}
+    for activity_type, lines in layers.items():
+        if lines:
+            merged[activity_type] = [
+                np.round(simplify(np.array(line) * tolerance, tolerance)[:, ::-1], 6).tolist()
+                for line in lines
+            ]
+    return merged
+
+
+def heat_points(routes, digits=3):
+    """
+    Bins every route point into a grid of 10^-digits degrees (about 100 m for 3 digits).
+    Returns [lat, lon, weight] triples with weights scaled to 0..1.
+    """
+    if not routes:
+        return []
+    scale = 10 ** digits
+    cells = np.round(np.concatenate([points for _, points in routes]) * scale).astype(np.int64)
+    # Pack each (lat, lon) cell into one integer; a 1-D unique is much faster than unique(axis=0)
+    width = 360 * scale + 1
+    keys = (cells[:, 0] + 90 * scale) * width + (cells[:, 1] + 180 * scale)
+    unique, counts = np.unique(keys, return_counts=True)
+    lat = (unique // width - 90 * scale) / scale
+    lon = (unique % width - 180 * scale) / scale
+    return np.column_stack((lat, lon, counts / counts.max())).tolist()
+
+
+def build_map(df, file_name=map_filename, zoom=12, heatmap=False, routes=None):
+    """
+    Renders the routes of a normalized activity frame (newest first) to an HTML map.
+    Routes are simplified for the starting zoom level and merged into one GeoJSON layer
+    per activity type; heatmap=True adds a toggleable heat layer.
+    Pass already decoded routes (e.g. from route_decoder.load_routes) to skip decoding.
+    Returns the number of activities with a route.
+    """
+    if routes is None:
+        routes = decode_routes(df)
+    # Center on the start of the newest route
+    map_center = routes[0][1][0].tolist() if routes else [0, 0]
+    m = folium.Map(location=map_center, zoom_start=zoom, tiles="OpenStreetMap", control_scale=True,
+                   world_copy_jump=False, no_warp=True, max_bounds=[[-90, -180], [90, 180]])
+
+    tolerance = zoom_tolerance(zoom, map_center[0])
+    for index, (activity_type, lines) in enumerate(sorted(merge_routes(routes, tolerance).items())):
+        color = layer_colors[index % len(layer_colors)]
+        feature = {
+            "type": "Feature",
+            "properties": {"type": activity_type},
+            "geometry": {"type": "MultiLineString", "coordinates": lines},
+        }
+        folium.GeoJson(
+            feature,
+            name=activity_type,
+            style_function=lambda _, color=color: {"color": color, "weight": 2.5, "opacity": 0.3},
+        ).add_to(m)
+
+    if heatmap and routes:
+        HeatMap(heat_points(routes), name="Heatmap", show=False, radius=8).add_to(m)
+    if routes:
+        folium.LayerControl().add_to(m)
+
+    m.save(file_name)
+    return len(routes)
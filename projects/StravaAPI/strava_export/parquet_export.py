@@ -0,0 +1,37 @@
+import os
+
+parquet_dirname = "strava_parquet"
+
+
+def write_parquet(frames, directory=parquet_dirname):
+    """
+    Writes the normalized activity table and the monthly aggregates from
+    activity_transform.build_frames as Parquet datasets partitioned by year:
+      <directory>/activities/year=YYYY/*.parquet
+      <directory>/monthly/year=YYYY/*.parquet
+    Each run replaces the partitions it writes, so re-exporting a year never duplicates rows.
+    Activities without a start date land in the year=0 partition: pyarrow cannot yet
+    read a null hive partition back through pandas.
+    pyarrow is only needed for this export, so it is imported here.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    activities = frames["normalized"]
+    monthly = frames["monthly"]
+    activity_years = activities["start"].dt.year.astype("Int64").fillna(0)
+    monthly_years = monthly["Month"].str.slice(0, 4).astype("Int64").fillna(0)
+
+    for name, df, years in (("activities", activities, activity_years), ("monthly", monthly, monthly_years)):
+        # The partition column is added in pyarrow, not pandas: left in the stored pandas
+        # metadata it makes pd.read_parquet reject the dictionary column the partitions read back as
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.append_column("year", pa.array(years, type=pa.int64()))
+        ds.write_dataset(
+            table,
+            os.path.join(directory, name),
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("year", pa.int64())]), flavor="hive"),
+            existing_data_behavior="delete_matching",
+        )
+    return directory
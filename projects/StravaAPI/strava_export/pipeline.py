@@ -0,0 +1,217 @@
+import argparse
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+import requests
+import urllib3
+
+from strava_export.activity_cache import ActivityCache, cache_filename, sync_activities
+from strava_export.activity_fetcher import make_session
+from strava_export.activity_transform import build_frames
+from strava_export.excel_export import excel_filename, write_workbook
+from strava_export.map_export import build_map, map_filename
+from strava_export.parquet_export import parquet_dirname, write_parquet
+from strava_export.rate_limiter import RateLimitedSession
+from strava_export.route_decoder import load_routes
+from strava_export.stream_downloader import download_streams, select_activities, streams_dirname
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+auth_url = "https://www.strava.com/oauth/token"
+
+payload = {
+    'client_id': "CLIENT_ID",
+    'client_secret': 'CLIENT_SECRET',
+    'refresh_token': 'REFRESH_TOKEN',
+    'grant_type': "refresh_token",
+    'f': 'json'
+}
+
+frames_filename = "strava_frames.pkl"
+
+
+def request_access_token():
+    """Exchanges the refresh token for an access token. Returns None on failure."""
+    print("Requesting Token...\n")
+    res = requests.post(auth_url, data=payload, verify=False)
+    return res.json().get('access_token')
+
+
+def peak_rss_mb():
+    """Returns the peak resident memory of the process so far in MB, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024)
+
+
+class Pipeline:
+    """
+    State shared by the stages of one run.
+    Each input is produced on first use: from an earlier stage of the same run if
+    it already ran, otherwise from the files a previous run left behind, so any
+    stage can run on its own.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self._session = None
+        self._cache = None
+        self._frames = None
+        self.timings = []
+
+    @property
+    def session(self):
+        if self._session is None:
+            access_token = request_access_token()
+            if not access_token:
+                raise RuntimeError("Failed to retrieve access token.")
+            print("Access Token = {}\n".format(access_token))
+            self._session = RateLimitedSession(make_session(access_token))
+        return self._session
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = ActivityCache(self.args.cache)
+        return self._cache
+
+    @property
+    def frames(self):
+        if self._frames is None:
+            frames_file = self.args.frames
+            saved = pd.read_pickle(frames_file) if os.path.exists(frames_file) else None
+            # The pickle records the activities it was built from; the cache file's mtime
+            # would not do, since the map stage writes decoded routes into the same file
+            if isinstance(saved, dict) and saved.get("activities_key") == self.cache.activities_key():
+                self._frames = saved["frames"]
+            else:
+                # Missing or built from other activities
+                stage_transform(self)
+        return self._frames
+
+    def close(self):
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    @contextmanager
+    def stage(self, name):
+        """Times a stage and records the memory high-water mark reached while it ran."""
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        traced = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if tracemalloc.is_tracing() else None
+        self.timings.append((name, elapsed, peak_rss_mb(), traced))
+
+    def report(self):
+        print(f"\n{'stage':<10}{'seconds':>10}{'peak RSS MB':>14}{'traced MB':>12}")
+        for name, elapsed, rss, traced in self.timings:
+            rss = f"{rss:.1f}" if rss is not None else "-"
+            traced = f"{traced:.1f}" if traced is not None else "-"
+            print(f"{name:<10}{elapsed:>10.2f}{rss:>14}{traced:>12}")
+
+
+def stage_fetch(pipeline):
+    activities = sync_activities(pipeline.session, pipeline.cache, full=pipeline.args.full)
+    if pipeline.args.full and os.path.exists(pipeline.args.frames):
+        # A full re-download can change activities without changing their count or newest start
+        os.remove(pipeline.args.frames)
+    print(f"Total activities retrieved: {len(activities)}")
+
+
+def stage_transform(pipeline):
+    activities = pipeline.cache.all_activities()
+    if not activities:
+        raise RuntimeError("No cached activities; run the fetch stage first.")
+    pipeline._frames = build_frames(activities)
+    pd.to_pickle({"activities_key": pipeline.cache.activities_key(), "frames": pipeline._frames}, pipeline.args.frames)
+
+
+def stage_excel(pipeline):
+    file_name = write_workbook(pipeline.frames, pipeline.args.excel)
+    print(f"Data and charts successfully written to {file_name}")
+
+
+def stage_parquet(pipeline):
+    print(f"Parquet datasets written to {write_parquet(pipeline.frames, pipeline.args.parquet)}")
+
+
+def stage_map(pipeline):
+    df = pipeline.frames["normalized"]
+    routes = load_routes(df, pipeline.cache)
+    valid_routes = build_map(df, pipeline.args.map, heatmap=pipeline.args.heatmap, routes=routes)
+    print(f"Map with {valid_routes} routes saved as {pipeline.args.map}")
+
+
+def stage_streams(pipeline):
+    args = pipeline.args
+    stream_ids = select_activities(pipeline.frames["normalized"], args.stream_types, args.stream_limit)
+    downloaded = download_streams(pipeline.session, stream_ids, args.streams)
+    print(f"Downloaded streams for {downloaded} activities ({len(stream_ids)} selected) to {args.streams}")
+
+
+# In the order they run, whatever order they are given in
+STAGES = {
+    "fetch": stage_fetch,
+    "transform": stage_transform,
+    "excel": stage_excel,
+    "parquet": stage_parquet,
+    "map": stage_map,
+    "streams": stage_streams,
+}
+default_stages = ["fetch", "transform", "excel", "map"]
+
+
+def run(args):
+    """Runs the selected stages in order. Returns the Pipeline, whose timings hold the per-stage figures."""
+    pipeline = Pipeline(args)
+    try:
+        for name, stage in STAGES.items():
+            if name in args.stages:
+                with pipeline.stage(name):
+                    stage(pipeline)
+    finally:
+        pipeline.close()
+    return pipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export Strava activities to Excel, Parquet and an HTML map.")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=default_stages,
+                        help=f"stages to run (default: {' '.join(default_stages)}); "
+                             "stages whose inputs did not run this time read them from the cache files")
+    parser.add_argument("--full", action="store_true", help="re-download the whole history instead of only new activities")
+    parser.add_argument("--cache", default=cache_filename, help="SQLite activity and route cache")
+    parser.add_argument("--frames", default=frames_filename, help="cached output of the transform stage")
+    parser.add_argument("--excel", default=excel_filename, help="workbook written by the excel stage")
+    parser.add_argument("--parquet", default=parquet_dirname, metavar="DIR", help="directory for the parquet stage (needs pyarrow)")
+    parser.add_argument("--map", default=map_filename, help="HTML file written by the map stage")
+    parser.add_argument("--heatmap", action="store_true", help="add a heatmap layer to the route map")
+    parser.add_argument("--streams", default=streams_dirname, metavar="DIR", help="directory for the streams stage")
+    parser.add_argument("--stream-types", nargs="+", metavar="TYPE", help="only fetch streams for these activity types")
+    parser.add_argument("--stream-limit", type=int, help="only fetch streams for the newest N selected activities")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report the peak Python allocations of each stage (slows the run down)")
+    args = parser.parse_args(argv)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    try:
+        pipeline = run(args)
+    except (requests.RequestException, RuntimeError) as e:
+        # Cached activities and finished streams are kept; running again picks up from there
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    pipeline.report()
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+
+import requests
+
+# Strava's short-term limit resets on natural 15-minute boundaries, the daily one at midnight UTC
+window_seconds = 15 * 60
+day_seconds = 24 * 60 * 60
+
+retry_statuses = {429, 500, 502, 503, 504}
+
+
+def parse_limits(headers):
+    """
+    Reads Strava's rate-limit headers.
+    Returns ((limit_15min, limit_daily), (usage_15min, usage_daily)), or None if they are missing.
+    """
+    limit = headers.get("X-RateLimit-Limit")
+    usage = headers.get("X-RateLimit-Usage")
+    if not limit or not usage:
+        return None
+    try:
+        limits = tuple(int(x) for x in limit.split(","))[:2]
+        usages = tuple(int(x) for x in usage.split(","))[:2]
+    except ValueError:
+        return None
+    if len(limits) != 2 or len(usages) != 2:
+        return None
+    return limits, usages
+
+
+class RateLimitedSession:
+    """
+    Wraps a requests.Session so every GET is paced to stay inside Strava's
+    15-minute and daily budgets, and retried with jittered exponential backoff
+    on 429s, 5xx responses and connection errors.
+    Requests go out freely until a window's usage passes pace_after (a fraction
+    of its limit); the rest of that budget is then spread over what is left of the window.
+    Safe to share between the fetcher's worker threads.
+    """
+
+    def __init__(self, session, max_retries=5, base_delay=1.0, max_delay=120.0, pace_after=0.8,
+                 clock=time.time, sleep=time.sleep):
+        self.session = session
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.pace_after = pace_after
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.limits = None
+        self.usage = None
+        # When usage was last known; counts from a window that has since reset no longer apply
+        self.observed = 0.0
+        self.next_slot = 0.0
+        self.last_start = 0.0
+
+    def _seconds_left(self, now, period):
+        return period - (now % period)
+
+    def _used(self, now):
+        """Usage of each window as of now: zero for a window that has reset since the usage was observed."""
+        return tuple(used if now // period == self.observed // period else 0
+                     for used, period in zip(self.usage, (window_seconds, day_seconds)))
+
+    def _interval(self, now):
+        """Minimum spacing between requests needed to make the remaining budgets last until their windows reset."""
+        if self.limits is None:
+            return 0.0
+        interval = 0.0
+        for limit, used, period in zip(self.limits, self._used(now), (window_seconds, day_seconds)):
+            remaining = limit - used
+            left = self._seconds_left(now, period)
+            if remaining <= 0:
+                # Budget spent: wait for this window to reset
+                return left
+            if used >= limit * self.pace_after:
+                # Spaced so the last of the remaining requests still lands before the reset
+                interval = max(interval, left / (remaining + 1))
+        return interval
+
+    def _reserve_slot(self):
+        """Returns how long the calling thread must wait before sending its request."""
+        with self.lock:
+            now = self.clock()
+            start = max(now, self.next_slot)
+            if self.usage is not None:
+                # Never send into a spent budget: move to the reset of whichever window is full
+                while True:
+                    full = [self._seconds_left(start, period)
+                            for limit, used, period in zip(self.limits, self._used(start), (window_seconds, day_seconds))
+                            if used >= limit]
+                    if not full:
+                        break
+                    start += max(full)
+                # Count this request now so concurrent threads pace against it too
+                used = self._used(start)
+                self.usage = (used[0] + 1, used[1] + 1)
+                self.observed = start
+            self.last_start = start
+            self.next_slot = start + self._interval(start)
+            return start - now
+
+    def _record(self, response):
+        parsed = parse_limits(response.headers)
+        if parsed is not None:
+            with self.lock:
+                now = self.clock()
+                self.limits, self.usage = parsed
+                self.observed = now
+                # Re-plan from the fresh counts, after any request another thread has already been given a slot for
+                start = max(now, self.last_start)
+                self.next_slot = start + self._interval(start)
+
+    def _backoff(self, attempt):
+        # "Full jitter": a random delay up to the exponential cap
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def get(self, url, **kwargs):
+        """Sends a paced GET, retrying transient failures. Returns the final response."""
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve_slot()
+            if wait > 0:
+                self.sleep(wait)
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self.sleep(self._backoff(attempt))
+                continue
+
+            self._record(response)
+            if response.status_code not in retry_statuses or attempt == self.max_retries:
+                return response
+            if response.status_code == 429:
+                # Over the limit: hold every thread until the 15-minute window resets
+                with self.lock:
+                    now = self.clock()
+                    self.next_slot = max(self.next_slot, now + self._seconds_left(now, window_seconds))
+            else:
+                self.sleep(self._backoff(attempt))
+        return response
+
+    def __getattr__(self, name):
+        # Everything else (headers, mount, close, ...) goes to the wrapped session
+        return getattr(self.session, name)
@@ -0,0 +1,65 @@
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import polyline
+
+
+def polyline_checksum(encoded):
+    """Returns a CRC32 of an encoded polyline, used to spot routes that changed since they were cached."""
+    return zlib.crc32(encoded.encode("ascii"))
+
+
+def _decode_chunk(encoded_list):
+    """Decodes polylines into packed float32 (lat, lon) pairs; runs in the worker processes."""
+    return [np.array(polyline.decode(encoded), dtype=np.float32).tobytes() for encoded in encoded_list]
+
+
+def decode_polylines(encoded_list, workers=None, chunk_size=64):
+    """
+    Decodes many polylines across a process pool, in chunks so that each task
+    is worth the cost of sending it to a worker.
+    Returns the packed float32 points of each polyline, in input order.
+    Small inputs are decoded in-process, where starting a pool would cost more than it saves.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(encoded_list) <= chunk_size:
+        return _decode_chunk(encoded_list)
+    chunks = [encoded_list[i:i + chunk_size] for i in range(0, len(encoded_list), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [points for chunk in executor.map(_decode_chunk, chunks) for points in chunk]
+
+
+def points_from_blob(blob):
+    """Views packed float32 points as an N x 2 (lat, lon) array without copying."""
+    return np.frombuffer(blob, dtype=np.float32).reshape(-1, 2)
+
+
+def load_routes(df, cache, workers=None):
+    """
+    Returns (activity type, N x 2 float32 array) for every activity in a normalized
+    frame that has a route, in frame order.
+    Routes come from the cache's routes table; ones that are missing or whose polyline
+    changed are decoded in parallel and stored for the next run.
+    """
+    cached = cache.cached_routes()
+    wanted = []
+    missing = []
+    for activity_id, activity_type, encoded in zip(df["id"].tolist(), df["type"], df["summary_polyline"]):
+        if not encoded:
+            continue
+        checksum = polyline_checksum(encoded)
+        entry = cached.get(activity_id)
+        if entry is None or entry[0] != checksum:
+            missing.append((activity_id, checksum, encoded))
+        wanted.append((activity_id, activity_type))
+
+    if missing:
+        blobs = decode_polylines([encoded for _, _, encoded in missing], workers)
+        rows = [(activity_id, checksum, blob) for (activity_id, checksum, _), blob in zip(missing, blobs)]
+        cache.store_routes(rows)
+        cached.update((activity_id, (checksum, blob)) for activity_id, checksum, blob in rows)
+        print(f"Decoded {len(missing)} new routes ({len(wanted)} in total).")
+
+    return [(activity_type, points_from_blob(cached[activity_id][1])) for activity_id, activity_type in wanted]
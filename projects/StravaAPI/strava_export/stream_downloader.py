@@ -0,0 +1,110 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+streams_url = "https://www.strava.com/api/v3/activities/{id}/streams"
+streams_dirname = "strava_streams"
+
+# Stream types requested from Strava, and the dtype each one is stored as
+stream_dtypes = {
+    "time": np.int32,
+    "distance": np.float32,
+    "latlng": np.float32,
+    "altitude": np.float32,
+    "velocity_smooth": np.float32,
+    "heartrate": np.int16,
+    "cadence": np.int16,
+    "watts": np.int16,
+    "temp": np.int8,
+    "moving": np.bool_,
+    "grade_smooth": np.float32,
+}
+
+
+def select_activities(df, types=None, limit=None):
+    """Returns the ids of the activities in a normalized frame to fetch streams for, newest first."""
+    if types:
+        df = df.loc[df["type"].isin(types)]
+    ids = df["id"].tolist()
+    return ids[:limit] if limit else ids
+
+
+def stream_path(directory, activity_id):
+    return os.path.join(directory, f"{activity_id}.npz")
+
+
+def to_array(values, dtype):
+    """Converts one stream to a compact array; streams with gaps become float32 with NaNs."""
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError):
+        return np.array(values, dtype=np.float64).astype(np.float32)
+
+
+def fetch_streams(session, activity_id, url=streams_url):
+    """
+    Fetches every stream of one activity.
+    Returns {stream type: array}; empty for activities without streams (e.g. manual entries).
+    Raises requests.HTTPError on any other error response.
+    """
+    response = session.get(url.format(id=activity_id),
+                           params={'keys': ",".join(stream_dtypes), 'key_by_type': 'true'})
+    if response.status_code == 404:
+        return {}
+    response.raise_for_status()
+    return {
+        name: to_array(stream["data"], stream_dtypes.get(name, np.float32))
+        for name, stream in response.json().items()
+    }
+
+
+def save_streams(directory, activity_id, streams):
+    """
+    Writes one activity's streams as a compressed .npz, one array per stream.
+    The file is written under a temporary name and renamed into place, so an
+    interrupted run never leaves a partial file that would be mistaken for a finished one.
+    """
+    path = stream_path(directory, activity_id)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.savez_compressed(f, **streams)
+    os.replace(temp_path, path)
+
+
+def load_streams(directory, activity_id):
+    """Returns {stream type: array} for a downloaded activity."""
+    with np.load(stream_path(directory, activity_id)) as data:
+        return {name: data[name] for name in data.files}
+
+
+def download_streams(session, activity_ids, directory=streams_dirname, window=4, url=streams_url):
+    """
+    Downloads the streams of the given activities, keeping up to `window` requests in flight.
+    Activities already in `directory` are skipped, so an interrupted run resumes where it stopped.
+    Share a RateLimitedSession with the other stages so all requests draw on one budget.
+    Returns the number of activities downloaded.
+    """
+    os.makedirs(directory, exist_ok=True)
+    todo = iter([activity_id for activity_id in activity_ids
+                 if not os.path.exists(stream_path(directory, activity_id))])
+    downloaded = 0
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        pending = deque()
+        for activity_id in islice(todo, window):
+            pending.append((activity_id, executor.submit(fetch_streams, session, activity_id, url)))
+        while pending:
+            activity_id, future = pending.popleft()
+            try:
+                streams = future.result()
+            except Exception:
+                for _, later in pending:
+                    later.cancel()
+                raise
+            save_streams(directory, activity_id, streams)
+            downloaded += 1
+            for next_id in islice(todo, 1):
+                pending.append((next_id, executor.submit(fetch_streams, session, next_id, url)))
+    return downloaded
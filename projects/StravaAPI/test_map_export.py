@@ -0,0 +1,17 @@
+from strava_export.activity_transform import normalize_activities
+from strava_export.map_export import decode_routes
+
+
+def test_activities_without_a_map_have_no_route():
+    activities = [
+        {"id": 1, "type": "Run", "start_date": "2024-03-01T07:00:00Z", "map": {"summary_polyline": "_p~iF~ps|U_ulLnnqC"}},
+        {"id": 2, "type": "Workout", "start_date": "2024-03-02T07:00:00Z"},
+        {"id": 3, "type": "Ride", "start_date": "2024-03-03T07:00:00Z", "map": {"summary_polyline": ""}},
+    ]
+    routes = decode_routes(normalize_activities(activities))
+    assert [(activity_type, len(points)) for activity_type, points in routes] == [("Run", 2)]
+
+
+def test_missing_polylines_are_normalized_to_empty_strings():
+    df = normalize_activities([{"id": 1, "type": "Workout", "start_date": "2024-03-02T07:00:00Z"}])
+    assert df["summary_polyline"].tolist() == [""]
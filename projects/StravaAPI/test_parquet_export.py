@@ -0,0 +1,24 @@
+import os
+
+import pandas as pd
+
+from strava_export.activity_transform import build_frames
+from strava_export.parquet_export import write_parquet
+
+
+def test_datasets_read_back_with_pandas(tmp_path):
+    activities = [
+        {"id": 1, "name": "Morning Run", "type": "Run", "distance": 5000, "moving_time": 1500,
+         "start_date": "2023-12-31T07:00:00Z"},
+        {"id": 2, "name": "Ride", "type": "Ride", "distance": 20000, "moving_time": 3600,
+         "start_date": "2024-01-02T07:00:00Z"},
+        {"id": 3, "name": "Undated", "type": "Walk", "distance": 1000, "moving_time": 600},
+    ]
+    directory = write_parquet(build_frames(activities), str(tmp_path / "parquet"))
+
+    df = pd.read_parquet(os.path.join(directory, "activities"))
+    assert sorted(df["id"].tolist()) == [1, 2, 3]
+    years = dict(zip(df["id"].tolist(), df["year"].astype(int).tolist()))
+    assert (years[1], years[2], years[3]) == (2023, 2024, 0)
+    monthly = pd.read_parquet(os.path.join(directory, "monthly"))
+    assert sorted(monthly["year"].astype(int).unique().tolist()) == [2023, 2024]
@@ -0,0 +1,58 @@
+from strava_export.rate_limiter import RateLimitedSession, day_seconds, window_seconds
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, headers, status_code=200):
+        self.headers = headers
+        self.status_code = status_code
+
+
+class FakeStrava:
+    """Counts requests per window the way Strava does and fails any request over a limit."""
+
+    def __init__(self, clock, limits):
+        self.clock = clock
+        self.limits = limits
+        self.counts = {}
+        self.sent = []
+
+    def get(self, url, **kwargs):
+        now = self.clock()
+        keys = (("15min", now // window_seconds), ("day", now // day_seconds))
+        for key in keys:
+            self.counts[key] = self.counts.get(key, 0) + 1
+        usage = tuple(self.counts[key] for key in keys)
+        assert all(used <= limit for used, limit in zip(usage, self.limits)), f"over the limit at {now}"
+        self.sent.append(now)
+        return FakeResponse({"X-RateLimit-Limit": "%d,%d" % self.limits, "X-RateLimit-Usage": "%d,%d" % usage})
+
+
+def run(limits, requests):
+    clock = FakeClock()
+    strava = FakeStrava(clock, limits)
+    session = RateLimitedSession(strava, clock=clock, sleep=clock.sleep)
+    for _ in range(requests):
+        session.get("https://example.invalid")
+    return strava.sent
+
+
+def test_spent_window_budget_is_used_in_full_after_the_reset():
+    # 10 requests per 15 minutes: 40 requests fit in 4 windows
+    sent = run((10, 1000), 40)
+    assert [int(t // window_seconds) for t in sent] == [w for w in range(4) for _ in range(10)]
+
+
+def test_spent_daily_budget_is_used_in_full_the_next_day():
+    sent = run((100, 10), 30)
+    assert [int(t // day_seconds) for t in sent] == [d for d in range(3) for _ in range(10)]
@@ -0,0 +1,19 @@
+from strava_export.activity_cache import ActivityCache
+from strava_export.activity_transform import normalize_activities
+from strava_export.route_decoder import load_routes
+
+
+def test_activities_without_a_map_are_skipped_and_routes_are_cached(tmp_path):
+    activities = [
+        {"id": 1, "type": "Run", "start_date": "2024-03-01T07:00:00Z", "map": {"summary_polyline": "_p~iF~ps|U_ulLnnqC"}},
+        {"id": 2, "type": "Workout", "start_date": "2024-03-02T07:00:00Z"},
+    ]
+    df = normalize_activities(activities)
+    cache = ActivityCache(str(tmp_path / "cache.sqlite"))
+    try:
+        for _ in range(2):
+            routes = load_routes(df, cache, workers=1)
+            assert [(activity_type, points.shape) for activity_type, points in routes] == [("Run", (2, 2))]
+        assert list(cache.cached_routes()) == [1]
+    finally:
+        cache.close()
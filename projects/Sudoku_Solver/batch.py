@@ -0,0 +1,218 @@
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from bitmask_solver import NODE_LIMIT, SOLVED, TIMEOUT, UNSOLVABLE, solve_bitmask_bounded
+from main import Board, ENGINES, is_valid_board, solve
+
+# Per-puzzle status for boards whose clues already conflict; the other
+# statuses (SOLVED, UNSOLVABLE, TIMEOUT, NODE_LIMIT) come from bitmask_solver
+INVALID = "invalid"
+
+
+def board_to_line(board: Board) -> str:
+    """
+    Formats a board as a single 81-character line, one digit per cell.
+    Empty cells are written as 0.
+    """
+    return "".join(str(num) for row in board for num in row)
+
+
+def line_to_board(line: str) -> Board:
+    """
+    Parses a single 81-character line into a 9x9 board.
+    Empty cells may be written as 0 or '.'.
+    Raises ValueError if the line is not a valid puzzle.
+    """
+    line = line.strip()
+    if len(line) != 81:
+        raise ValueError(f"Invalid puzzle line length: {len(line)}")
+    cells = [0 if ch == "." else int(ch) for ch in line]
+    return [cells[r * 9:r * 9 + 9] for r in range(9)]
+
+
+def iter_puzzles(filename: str) -> Iterator[Board]:
+    """
+    Streams puzzles from a multi-puzzle text file without loading it whole.
+    Accepts one 81-character line per puzzle, or the 9-line comma-separated
+    format used by read_board_from_file (blocks may be separated by blank lines).
+    Raises ValueError on a malformed puzzle.
+    """
+    rows = []
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                if rows:
+                    raise ValueError("Invalid board height.")
+                continue
+            if "," not in line:
+                yield line_to_board(line)
+                continue
+            row = list(map(int, line.split(',')))
+            if len(row) != 9:
+                raise ValueError(f"Invalid row length: {row}")
+            rows.append(row)
+            if len(rows) == 9:
+                yield rows
+                rows = []
+    if rows:
+        raise ValueError("Invalid board height.")
+
+
+def read_puzzles(filename: str) -> Iterator[Board]:
+    """
+    Streams puzzles from a text puzzle file or a binary puzzle store,
+    choosing the reader from the file contents.
+    """
+    from puzzle_store import PuzzleStore, is_store
+    if not is_store(filename):
+        yield from iter_puzzles(filename)
+        return
+    with PuzzleStore(filename) as store:
+        yield from store.iter_boards()
+
+
+def _board_line(board: Board) -> Optional[str]:
+    """
+    Formats a board for the workers, or returns None when a cell is outside
+    0-9 and the board cannot be written as 81 digits.
+    """
+    if all(isinstance(num, int) and 0 <= num <= 9 for row in board for num in row):
+        return board_to_line(board)
+    return None
+
+
+def format_result(index: int, status: str, board: Board) -> str:
+    """
+    Formats one batch result as an output line: "index,status,board".
+    The board is the solution when solved and the original puzzle otherwise,
+    as 81 digits; the field is left empty for a board that cannot be
+    written that way (cells outside 0-9).
+    """
+    return f"{index},{status},{_board_line(board) or ''}\n"
+
+
+def _solve_line(line: Optional[str], engine: str, time_limit: Optional[float] = None,
+                node_limit: Optional[int] = None) -> Tuple[str, Optional[str]]:
+    """
+    Solves one puzzle given as an 81-character line.
+    When a time or node limit is set, the bounded bitmask solver is used
+    instead of the named engine, so one bad puzzle cannot stall a worker.
+    Returns a (status, line) tuple; the line is the solution when solved,
+    and the original puzzle otherwise.
+    A None line (cells out of range) is reported as INVALID.
+    """
+    if line is None:
+        return INVALID, None
+    board = line_to_board(line)
+    if not is_valid_board(board):
+        return INVALID, line
+    if time_limit is not None or node_limit is not None:
+        status = solve_bitmask_bounded(board, time_limit, node_limit)
+    else:
+        status = SOLVED if solve(board, engine) else UNSOLVABLE
+    if status != SOLVED:
+        return status, line
+    return SOLVED, board_to_line(board)
+
+
+def _solve_chunk(lines: List[Optional[str]], engine: str, time_limit: Optional[float],
+                 node_limit: Optional[int]) -> List[Tuple[str, Optional[str]]]:
+    """Worker entry point: solves a chunk of puzzles in one task."""
+    return [_solve_line(line, engine, time_limit, node_limit) for line in lines]
+
+
+def solve_batch(puzzles: Iterable[Board], engine: str = "bitmask",
+                workers: Optional[int] = None, chunk_size: int = 256,
+                time_limit: Optional[float] = None,
+                node_limit: Optional[int] = None) -> Iterator[Tuple[int, str, Board]]:
+    """
+    Solves many puzzles across a process pool.
+    Puzzles are sent to the workers in chunks, with a bounded number of
+    chunks in flight so memory stays flat on very large inputs.
+    time_limit (seconds) and node_limit cap the work spent on each puzzle.
+    Yields (index, status, board) tuples in input order as they complete.
+    A board with cells outside 0-9 is yielded unchanged with status INVALID.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown solver engine: {engine}")
+    workers = workers or os.cpu_count() or 1
+    puzzles = iter(puzzles)
+    chunks = iter(lambda: list(islice(puzzles, chunk_size)), [])
+
+    def results_of(boards, results):
+        # The original board stands in for puzzles that could not be sent as a line
+        for board, (status, line) in zip(boards, results):
+            yield status, board if line is None else line_to_board(line)
+
+    index = 0
+    if workers == 1:
+        # Run in-process; handy for debugging and tiny inputs
+        for chunk in chunks:
+            results = _solve_chunk([_board_line(board) for board in chunk], engine, time_limit, node_limit)
+            for status, board in results_of(chunk, results):
+                yield index, status, board
+                index += 1
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        def submit(chunk):
+            lines = [_board_line(board) for board in chunk]
+            pending.append((chunk, executor.submit(_solve_chunk, lines, engine, time_limit, node_limit)))
+
+        for chunk in islice(chunks, workers * 2):
+            submit(chunk)
+        while pending:
+            chunk, future = pending.popleft()
+            results = future.result()
+            # Keep the pool busy while the caller consumes this chunk
+            for next_chunk in islice(chunks, 1):
+                submit(next_chunk)
+            for status, board in results_of(chunk, results):
+                yield index, status, board
+                index += 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Solve a file of Sudoku puzzles in parallel.",
+        epilog="The output has one line per puzzle, in input order: index,status,board. "
+               "The board is the 81-digit solution when solved, the original puzzle otherwise, "
+               "and empty for an invalid puzzle with cells outside 0-9.")
+    parser.add_argument("input_file")
+    parser.add_argument("output_file")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="bitmask",
+                        help="solver engine to use (default: bitmask)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=256,
+                        help="puzzles sent to a worker per task (default: 256)")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="per-puzzle time budget in seconds")
+    parser.add_argument("--node-limit", type=int, default=None,
+                        help="per-puzzle search node budget")
+    args = parser.parse_args()
+
+    counts = {SOLVED: 0, UNSOLVABLE: 0, INVALID: 0, TIMEOUT: 0, NODE_LIMIT: 0}
+    try:
+        with open(args.output_file, 'w') as out:
+            results = solve_batch(read_puzzles(args.input_file), args.engine,
+                                  args.workers, args.chunk_size,
+                                  args.time_limit, args.node_limit)
+            for index, status, board in results:
+                out.write(format_result(index, status, board))
+                counts[status] += 1
+    except (OSError, ValueError) as e:
+        print(f"Failed to process puzzles: {e}")
+        exit(1)
+
+    print(f"Processed {sum(counts.values())} puzzles: {counts[SOLVED]} solved, "
+          f"{counts[UNSOLVABLE]} unsolvable, {counts[INVALID]} invalid, "
+          f"{counts[TIMEOUT] + counts[NODE_LIMIT]} over budget. "
+          f"Results written to {args.output_file}")
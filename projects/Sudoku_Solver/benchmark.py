@@ -0,0 +1,80 @@
+import argparse
+import random
+import time
+from typing import List, Optional, Tuple
+
+from bitmask_solver import SOLVED, TIMEOUT, solve_bitmask_bounded
+from main import Board, ENGINES, is_valid_board, solve
+
+
+def make_puzzle(box: int, holes: float, rng: random.Random) -> Board:
+    """
+    Builds a random N x N puzzle (N = box * box) for benchmarking: a shuffled
+    pattern grid with a fraction of the cells cleared.
+    The puzzle is always solvable but not necessarily unique.
+    """
+    n = box * box
+    relabel = [0] + rng.sample(range(1, n + 1), n)
+    rows = [box * band + r for band in rng.sample(range(box), box) for r in rng.sample(range(box), box)]
+    cols = [box * stack + c for stack in rng.sample(range(box), box) for c in rng.sample(range(box), box)]
+    # Classic pattern: shifting each row by box (and each band by one) gives a valid grid
+    pattern = [[(box * (r % box) + r // box + c) % n + 1 for c in range(n)] for r in range(n)]
+    puzzle = [[relabel[pattern[r][c]] for c in cols] for r in rows]
+    for cell in rng.sample(range(n * n), int(holes * n * n)):
+        puzzle[cell // n][cell % n] = 0
+    return puzzle
+
+
+def run_benchmark(box: int, engine: str, puzzles: List[Board],
+                  time_limit: Optional[float] = None) -> Tuple[List[float], int]:
+    """
+    Solves copies of the puzzles with one engine.
+    The bitmask engine runs through solve_bitmask_bounded so that time_limit
+    can cut off pathological puzzles; other engines always run to completion.
+    Returns the solve times (seconds) of the solved puzzles and the number
+    of puzzles that hit the time limit.
+    Raises RuntimeError if a puzzle is not solved correctly.
+    """
+    times = []
+    timeouts = 0
+    for puzzle in puzzles:
+        board = [row[:] for row in puzzle]
+        start = time.perf_counter()
+        if engine == "bitmask":
+            status = solve_bitmask_bounded(board, time_limit)
+        else:
+            status = SOLVED if solve(board, engine) else None
+        elapsed = time.perf_counter() - start
+        if status == TIMEOUT:
+            timeouts += 1
+            continue
+        if status != SOLVED or not is_valid_board(board) or any(0 in row for row in board):
+            raise RuntimeError(f"{engine} failed on a {box * box}x{box * box} puzzle")
+        times.append(elapsed)
+    return times, timeouts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the solver engines at several board sizes.")
+    parser.add_argument("--boxes", type=int, nargs="+", default=[2, 3, 4, 5],
+                        help="box sizes to run (3 = 9x9, 4 = 16x16, 5 = 25x25)")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=["bitmask"])
+    parser.add_argument("--puzzles", type=int, default=10, help="puzzles per size")
+    parser.add_argument("--holes", type=float, default=0.75, help="fraction of cells cleared")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, default=10.0,
+                        help="per-puzzle time limit in seconds (bitmask engine only)")
+    args = parser.parse_args()
+
+    print(f"{'size':>7}  {'engine':<10}{'solved':>8}{'mean ms':>10}{'max ms':>10}")
+    for box in args.boxes:
+        # Same puzzles for every engine at a given size, independent of the other sizes
+        rng = random.Random(f"{args.seed}:{box}")
+        puzzles = [make_puzzle(box, args.holes, rng) for _ in range(args.puzzles)]
+        for engine in args.engines:
+            times, timeouts = run_benchmark(box, engine, puzzles, args.time_limit)
+            n = box * box
+            mean = 1000 * sum(times) / len(times) if times else float("nan")
+            worst = 1000 * max(times) if times else float("nan")
+            print(f"{n:>3}x{n:<3}  {engine:<10}{len(times):>4}/{len(puzzles):<3}"
+                  f"{mean:>10.2f}{worst:>10.2f}")
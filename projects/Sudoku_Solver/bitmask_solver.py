@@ -0,0 +1,352 @@
+import time
+from math import isqrt
+from typing import Dict, List, Optional, Tuple
+
+from solver_stats import SolverStats
+
+# Type alias for an N x N Sudoku board (N = box * box, e.g. 9, 16 or 25)
+Board = List[List[int]]
+
+# Result statuses reported by solve_bitmask_bounded
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+TIMEOUT = "timeout"
+NODE_LIMIT = "node_limit"
+CANCELLED = "cancelled"
+
+
+class _Geometry:
+    """
+    Precomputed lookup tables for one board size.
+    Candidate digits are stored as N-bit masks: bit (d - 1) set means digit d.
+    """
+    __slots__ = ("box", "size", "num_cells", "all_digits", "row_of", "col_of", "box_of",
+                 "units", "popcount")
+
+    def __init__(self, box: int):
+        n = box * box
+        self.box = box
+        self.size = n
+        self.num_cells = n * n
+        self.all_digits = (1 << n) - 1
+        self.row_of = [i // n for i in range(n * n)]
+        self.col_of = [i % n for i in range(n * n)]
+        self.box_of = [box * (i // (n * box)) + (i % n) // box for i in range(n * n)]
+        # The 3N units (N rows, N columns, N boxes) as lists of cell indices
+        self.units = (
+            [[r * n + c for c in range(n)] for r in range(n)]
+            + [[r * n + c for r in range(n)] for c in range(n)]
+            + [[(box * (b // box) + i // box) * n + box * (b % box) + i % box for i in range(n)]
+               for b in range(n)]
+        )
+        # Candidate counts by mask; a table is only worth it for small digit sets
+        self.popcount = [bin(m).count("1") for m in range(1 << n)] if n <= 16 else None
+
+
+_GEOMETRIES: Dict[int, _Geometry] = {}
+
+
+def _geometry(box: int) -> _Geometry:
+    if box not in _GEOMETRIES:
+        _GEOMETRIES[box] = _Geometry(box)
+    return _GEOMETRIES[box]
+
+
+def box_size(board: Board) -> int:
+    """
+    Returns the box size of a square board (3 for 9x9, 4 for 16x16, ...).
+    Raises ValueError if the board is not N x N with N a perfect square.
+    """
+    n = len(board)
+    box = isqrt(n)
+    if n == 0 or box * box != n or any(len(row) != n for row in board):
+        raise ValueError(f"Invalid board dimensions: {n} rows.")
+    return box
+
+
+class _State:
+    """
+    Incremental solver state: the flattened cells plus per-row, per-column
+    and per-box masks of the digits already placed.
+    """
+    __slots__ = ("geo", "cells", "rows", "cols", "boxes")
+
+    def __init__(self, geo, cells, rows, cols, boxes):
+        self.geo = geo
+        self.cells = cells
+        self.rows = rows
+        self.cols = cols
+        self.boxes = boxes
+
+    def copy(self) -> "_State":
+        return _State(self.geo, self.cells[:], self.rows[:], self.cols[:], self.boxes[:])
+
+    def candidates(self, i: int) -> int:
+        """Returns the mask of digits that can still be placed in cell i."""
+        geo = self.geo
+        return geo.all_digits & ~(self.rows[geo.row_of[i]] | self.cols[geo.col_of[i]]
+                                  | self.boxes[geo.box_of[i]])
+
+    def place(self, i: int, bit: int) -> None:
+        """Places the digit given by a single-bit mask into cell i."""
+        geo = self.geo
+        self.cells[i] = bit.bit_length()
+        self.rows[geo.row_of[i]] |= bit
+        self.cols[geo.col_of[i]] |= bit
+        self.boxes[geo.box_of[i]] |= bit
+
+
+def _state_from_board(board: Board) -> Optional[_State]:
+    """
+    Builds the solver state from an N x N board.
+    Returns None if the given clues already conflict with each other
+    or fall outside 1..N.
+    Raises ValueError if the board is not square with a square box size.
+    """
+    geo = _geometry(box_size(board))
+    n = geo.size
+    state = _State(geo, [0] * geo.num_cells, [0] * n, [0] * n, [0] * n)
+    for r in range(n):
+        for c in range(n):
+            num = board[r][c]
+            if num == 0:
+                continue
+            if not 1 <= num <= n:
+                return None
+            i = r * n + c
+            bit = 1 << (num - 1)
+            if not state.candidates(i) & bit:
+                return None
+            state.place(i, bit)
+    return state
+
+
+def _propagate(state: _State, stats: Optional[SolverStats] = None) -> bool:
+    """
+    Repeatedly fills naked singles (cells with one candidate) and hidden
+    singles (digits with one possible cell in a unit) until nothing changes.
+    Hidden singles are only looked for once no naked single is left.
+    When stats are given, counts the placements made by each technique.
+    Returns False if a contradiction is found, True otherwise.
+    """
+    geo = state.geo
+    cells, rows, cols, boxes = state.cells, state.rows, state.cols, state.boxes
+    row_of, col_of, box_of, all_digits = geo.row_of, geo.col_of, geo.box_of, geo.all_digits
+    changed = True
+    while changed:
+        changed = False
+
+        # Naked singles
+        for i in range(geo.num_cells):
+            if cells[i]:
+                continue
+            cand = all_digits & ~(rows[row_of[i]] | cols[col_of[i]] | boxes[box_of[i]])
+            if not cand:
+                return False
+            if not cand & (cand - 1):
+                state.place(i, cand)
+                changed = True
+                if stats is not None:
+                    stats.naked_singles += 1
+        if changed:
+            continue
+
+        # Hidden singles: track digits seen once and more than once per unit
+        for unit in geo.units:
+            once = twice = placed = 0
+            for i in unit:
+                if cells[i]:
+                    placed |= 1 << (cells[i] - 1)
+                    continue
+                cand = all_digits & ~(rows[row_of[i]] | cols[col_of[i]] | boxes[box_of[i]])
+                twice |= once & cand
+                once |= cand
+            if (once | placed) != all_digits:
+                # Some missing digit has nowhere to go in this unit
+                return False
+            hidden = once & ~twice & ~placed
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in unit:
+                    if not cells[i] and state.candidates(i) & bit:
+                        state.place(i, bit)
+                        changed = True
+                        if stats is not None:
+                            stats.hidden_singles += 1
+                        break
+                else:
+                    return False
+    return True
+
+
+def _select_cell(state: _State) -> Tuple[int, int]:
+    """
+    Picks the empty cell with the fewest candidates (minimum remaining values).
+    Returns (cell, candidates), or (-1, 0) if the board is full.
+    """
+    geo = state.geo
+    cells, rows, cols, boxes = state.cells, state.rows, state.cols, state.boxes
+    row_of, col_of, box_of, all_digits = geo.row_of, geo.col_of, geo.box_of, geo.all_digits
+    popcount = geo.popcount
+    best_cell, best_cand, best_count = -1, 0, geo.size + 1
+    for i in range(geo.num_cells):
+        if cells[i]:
+            continue
+        cand = all_digits & ~(rows[row_of[i]] | cols[col_of[i]] | boxes[box_of[i]])
+        count = popcount[cand] if popcount is not None else bin(cand).count("1")
+        if count < best_count:
+            best_cell, best_cand, best_count = i, cand, count
+            if count == 2:
+                break
+    return best_cell, best_cand
+
+
+def _select_branch(state: _State) -> List[Tuple[int, int]]:
+    """
+    Chooses what to branch on next, as a list of alternative (cell, bit)
+    placements. Prefers the most constrained cell; when every cell has more
+    than two candidates, a digit with only two possible cells in some unit
+    is used instead, which keeps large boards from thrashing.
+    Returns an empty list if the board is full.
+    """
+    cell, cand = _select_cell(state)
+    if cell < 0:
+        return []
+    branch = []
+    while cand:
+        bit = cand & -cand
+        cand ^= bit
+        branch.append((cell, bit))
+    if len(branch) <= 2:
+        return branch
+
+    geo = state.geo
+    cells, rows, cols, boxes = state.cells, state.rows, state.cols, state.boxes
+    row_of, col_of, box_of, all_digits = geo.row_of, geo.col_of, geo.box_of, geo.all_digits
+    for unit in geo.units:
+        once = twice = thrice = 0
+        for i in unit:
+            if cells[i]:
+                continue
+            cand = all_digits & ~(rows[row_of[i]] | cols[col_of[i]] | boxes[box_of[i]])
+            thrice |= twice & cand
+            twice |= once & cand
+            once |= cand
+        pairs = twice & ~thrice
+        if pairs:
+            bit = pairs & -pairs
+            return [(i, bit) for i in unit if not cells[i] and state.candidates(i) & bit]
+    return branch
+
+
+def _write_back(state: _State, board: Board) -> None:
+    n = state.geo.size
+    for i, num in enumerate(state.cells):
+        board[i // n][i % n] = num
+
+
+def _search(state: Optional[_State], stats: Optional[SolverStats] = None,
+            deadline: Optional[float] = None, node_limit: Optional[int] = None,
+            cancel=None) -> Tuple[str, Optional[_State]]:
+    """
+    Propagates constraints, then branches on the most constrained choice
+    (see _select_branch), with an explicit stack instead of recursion so
+    that deep searches on large boards cannot hit the recursion limit and
+    the search can stop part-way (see solve_bitmask_bounded).
+    When stats are given, guesses are reported as place/undo events;
+    propagated cells are only counted.
+    Returns (status, solved state); the state is None unless SOLVED.
+    """
+    if state is None or not _propagate(state, stats):
+        return UNSOLVABLE, None
+    n = state.geo.size
+    nodes = 0
+
+    # Each frame: (state, untried (cell, bit) alternatives in reverse order, guess that led here)
+    branch = _select_branch(state)
+    if not branch:
+        # No empty cells left; puzzle is solved
+        return SOLVED, state
+    stack = [(state, branch[::-1], None)]
+
+    while stack:
+        if cancel is not None and cancel.is_set():
+            return CANCELLED, None
+        if deadline is not None and time.monotonic() >= deadline:
+            return TIMEOUT, None
+        if node_limit is not None and nodes >= node_limit:
+            return NODE_LIMIT, None
+
+        parent, untried, guess = stack[-1]
+        if not untried:
+            # Every alternative failed here; take back the guess that led to this frame
+            stack.pop()
+            if stats is not None and guess is not None:
+                stats.undo(*guess)
+            continue
+
+        cell, bit = untried.pop()
+        child = parent.copy()
+        child.place(cell, bit)
+        nodes += 1
+        guess = (cell // n, cell % n, bit.bit_length())
+        if stats is not None:
+            stats.place(*guess, len(stack))
+
+        if not _propagate(child, stats):
+            if stats is not None:
+                stats.undo(*guess)
+            continue
+
+        branch = _select_branch(child)
+        if not branch:
+            return SOLVED, child
+        stack.append((child, branch[::-1], guess))
+
+    return UNSOLVABLE, None
+
+
+def solve_bitmask(board: Board, stats: Optional[SolverStats] = None) -> bool:
+    """
+    Solves the Sudoku puzzle using bitmask constraint propagation.
+    Works for any N x N board with square boxes (9x9, 16x16, 25x25, ...).
+    Keeps per-row, per-column and per-box digit masks, fills naked and
+    hidden singles, and branches on the most constrained cell.
+    Modifies the board in-place; fills stats if given.
+    Returns True if a solution is found, False if the puzzle is unsolvable.
+    Raises ValueError if the board dimensions are invalid.
+    """
+    if stats is None:
+        _, solved = _search(_state_from_board(board))
+    else:
+        with stats.phase("setup"):
+            state = _state_from_board(board)
+        with stats.phase("search"):
+            _, solved = _search(state, stats)
+
+    if solved is None:
+        return False
+
+    _write_back(solved, board)
+    return True
+
+
+def solve_bitmask_bounded(board: Board, time_limit: Optional[float] = None,
+                          node_limit: Optional[int] = None, cancel=None,
+                          stats: Optional[SolverStats] = None) -> str:
+    """
+    Solves the puzzle like solve_bitmask, but stops part-way once a budget
+    runs out.
+    time_limit is a wall-clock budget in seconds, node_limit a budget of
+    search nodes, and cancel any object with an is_set() method (such as a
+    threading.Event) that is checked before every node.
+    Modifies the board in-place only when it is solved; fills stats if given.
+    Returns SOLVED, UNSOLVABLE, TIMEOUT, NODE_LIMIT or CANCELLED.
+    Raises ValueError if the board dimensions are invalid.
+    """
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    status, solved = _search(_state_from_board(board), stats, deadline, node_limit, cancel)
+    if solved is not None:
+        _write_back(solved, board)
+    return status
@@ -0,0 +1,158 @@
+from typing import List, Optional, Tuple, Union
+
+# Type alias for a 9x9 Sudoku board
+Board = List[List[int]]
+
+# Precomputed index tables for the 81 cells of a flattened board
+ROW_UNITS = tuple(tuple(r * 9 + c for c in range(9)) for r in range(9))
+COL_UNITS = tuple(tuple(r * 9 + c for r in range(9)) for c in range(9))
+BOX_UNITS = tuple(
+    tuple((3 * (b // 3) + i // 3) * 9 + 3 * (b % 3) + i % 3 for i in range(9))
+    for b in range(9)
+)
+UNITS = ROW_UNITS + COL_UNITS + BOX_UNITS
+
+# The 20 cells sharing a row, column or box with each cell
+PEERS = tuple(
+    tuple(sorted(
+        (set(ROW_UNITS[i // 9]) | set(COL_UNITS[i % 9])
+         | set(BOX_UNITS[3 * (i // 27) + (i % 9) // 3]))
+        - {i}
+    ))
+    for i in range(81)
+)
+
+
+class CompactBoard:
+    """
+    A 9x9 Sudoku board stored as 81 bytes in row-major order (0 = empty).
+    The cells can live in a bytearray owned by the board, or in an 81-byte
+    slice of a larger shared buffer, so batches of boards can be handed to
+    worker processes or NumPy (np.frombuffer) without copying.
+    """
+    __slots__ = ("cells",)
+
+    def __init__(self, cells: Union[bytes, bytearray, memoryview, None] = None):
+        """
+        Wraps an 81-byte buffer, or creates an empty board when none is given.
+        Memoryviews and bytearrays are used as-is, not copied; a read-only
+        memoryview (such as a slice of a read-only mapped file) gives a
+        read-only board, see read_only. bytes are copied into a bytearray.
+        Raises ValueError if the buffer is not 81 bytes long.
+        """
+        if cells is None:
+            cells = bytearray(81)
+        elif isinstance(cells, bytes):
+            cells = bytearray(cells)
+        if len(cells) != 81:
+            raise ValueError(f"Invalid board size: {len(cells)}")
+        self.cells = cells
+
+    @classmethod
+    def from_rows(cls, board: Board) -> "CompactBoard":
+        """
+        Builds a compact board from the list-of-lists format.
+        Raises ValueError if the board dimensions or values are invalid.
+        """
+        if len(board) != 9 or any(len(row) != 9 for row in board):
+            raise ValueError("Invalid board dimensions.")
+        cells = bytearray(num for row in board for num in row)
+        if max(cells) > 9:
+            raise ValueError("Board values must be between 0 and 9.")
+        return cls(cells)
+
+    def to_rows(self) -> Board:
+        """Returns the board in the list-of-lists format."""
+        cells = self.cells
+        return [list(cells[r * 9:r * 9 + 9]) for r in range(9)]
+
+    @property
+    def read_only(self) -> bool:
+        """True when the cells live in read-only memory; use copy() to get a board that can be modified."""
+        return isinstance(self.cells, memoryview) and self.cells.readonly
+
+    def view(self) -> memoryview:
+        """Returns a memoryview over the 81 cells, without copying; it is read-only if the board is."""
+        return memoryview(self.cells)
+
+    def copy(self) -> "CompactBoard":
+        """Returns a writable board with its own copy of the cells."""
+        return CompactBoard(bytearray(self.cells))
+
+    def __getitem__(self, pos: Union[int, Tuple[int, int]]) -> int:
+        if isinstance(pos, tuple):
+            pos = pos[0] * 9 + pos[1]
+        return self.cells[pos]
+
+    def __setitem__(self, pos: Union[int, Tuple[int, int]], num: int) -> None:
+        """Sets a cell. Raises TypeError if the board is read-only."""
+        if isinstance(pos, tuple):
+            pos = pos[0] * 9 + pos[1]
+        self.cells[pos] = num
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactBoard):
+            return NotImplemented
+        return bytes(self.cells) == bytes(other.cells)
+
+    def __repr__(self) -> str:
+        return f"CompactBoard({bytes(self.cells)!r})"
+
+    def __reduce__(self):
+        # Pickle as a single 81-byte string
+        return (CompactBoard, (bytes(self.cells),))
+
+    def find_empty(self) -> Optional[int]:
+        """
+        Returns the flat index of the first empty cell.
+        Returns None if no empty cells are left.
+        """
+        index = bytes(self.cells).find(0)
+        return None if index < 0 else index
+
+    def is_valid_move(self, index: int, num: int) -> bool:
+        """
+        Checks whether placing num at the flat index conflicts with any of
+        the cell's 20 peers.
+        """
+        cells = self.cells
+        for peer in PEERS[index]:
+            if cells[peer] == num:
+                return False
+        return True
+
+    def is_valid(self) -> bool:
+        """
+        Checks whether the board has any conflicting numbers.
+        Returns True if no row, column or box holds a digit twice.
+        """
+        cells = self.cells
+        for unit in UNITS:
+            seen = 0
+            for i in unit:
+                num = cells[i]
+                if num:
+                    bit = 1 << num
+                    if seen & bit:
+                        return False
+                    seen |= bit
+        return True
+
+
+def pack_boards(boards: List[CompactBoard]) -> bytearray:
+    """Concatenates boards into one contiguous buffer of 81 bytes per board."""
+    buffer = bytearray(81 * len(boards))
+    for k, board in enumerate(boards):
+        buffer[k * 81:(k + 1) * 81] = board.cells
+    return buffer
+
+
+def unpack_boards(buffer: Union[bytearray, memoryview]) -> List[CompactBoard]:
+    """
+    Splits a contiguous buffer into boards that share its memory.
+    Raises ValueError if the buffer length is not a multiple of 81.
+    """
+    view = memoryview(buffer)
+    if len(view) % 81:
+        raise ValueError(f"Invalid buffer size: {len(view)}")
+    return [CompactBoard(view[k:k + 81]) for k in range(0, len(view), 81)]
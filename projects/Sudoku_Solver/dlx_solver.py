@@ -0,0 +1,257 @@
+from typing import Iterator, List, Optional
+
+from bitmask_solver import box_size
+from solver_stats import SolverStats
+
+# Type alias for an N x N Sudoku board
+Board = List[List[int]]
+
+
+def _constraint_columns(cell: int, digit: int, box: int) -> List[int]:
+    """
+    Returns the four exact-cover columns satisfied by placing digit (0 to N-1)
+    in cell (0 to N*N-1). On an N x N board there are N*N cell, row-digit,
+    column-digit and box-digit columns each (324 in total for 9x9).
+    """
+    n = box * box
+    r, c = divmod(cell, n)
+    b = box * (r // box) + c // box
+    return [cell, n * n + r * n + digit, 2 * n * n + c * n + digit, 3 * n * n + b * n + digit]
+
+
+class _DancingLinks:
+    """
+    Knuth's Algorithm X over a toroidal doubly linked list, stored in flat
+    Python lists (node index -> neighbour index) instead of node objects.
+    Node 0 is the root; the next 4*N*N nodes are the column headers.
+    Each matrix row is one candidate (cell, digit) placement, with id cell * N + digit.
+    """
+
+    def __init__(self, box: int = 3):
+        self.size = box * box
+        headers = 4 * self.size * self.size + 1
+        self.L = [i - 1 for i in range(headers)]
+        self.R = [i + 1 for i in range(headers)]
+        self.L[0], self.R[-1] = headers - 1, 0
+        self.U = list(range(headers))
+        self.D = list(range(headers))
+        self.C = list(range(headers))
+        self.S = [0] * headers
+        self.ROW = [-1] * headers
+        # First node of each matrix row, used to apply the given clues
+        self.row_head = []
+
+        for row_id in range(self.size ** 3):
+            cell, digit = divmod(row_id, self.size)
+            first = len(self.C)
+            self.row_head.append(first)
+            for k, col in enumerate(_constraint_columns(cell, digit, box)):
+                header = col + 1
+                node = first + k
+                self.C.append(header)
+                self.ROW.append(row_id)
+                # Insert at the bottom of the column
+                self.U.append(self.U[header])
+                self.D.append(header)
+                self.D[self.U[header]] = node
+                self.U[header] = node
+                self.S[header] += 1
+                # Link into the row ring
+                self.L.append(first + (k - 1) % 4)
+                self.R.append(first + (k + 1) % 4)
+
+    def cover(self, c: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def apply_clues(self, board: Board) -> bool:
+        """
+        Removes the columns satisfied by the board's given clues.
+        Returns False if two clues conflict or a clue is out of range, True otherwise.
+        """
+        n = self.size
+        covered = set()
+        for r in range(n):
+            for c in range(n):
+                num = board[r][c]
+                if num == 0:
+                    continue
+                if not 1 <= num <= n:
+                    return False
+                node = self.row_head[(r * n + c) * n + num - 1]
+                for _ in range(4):
+                    header = self.C[node]
+                    if header in covered:
+                        return False
+                    covered.add(header)
+                    self.cover(header)
+                    node = self.R[node]
+        return True
+
+    def _choose(self, r: int, solution: List[int], stats: Optional[SolverStats]) -> None:
+        """Adds matrix row r to the solution and covers its other columns."""
+        solution.append(self.ROW[r])
+        if stats is not None:
+            cell, digit = divmod(self.ROW[r], self.size)
+            stats.place(cell // self.size, cell % self.size, digit + 1, len(solution))
+        R, C = self.R, self.C
+        j = R[r]
+        while j != r:
+            self.cover(C[j])
+            j = R[j]
+
+    def _unchoose(self, r: int, solution: List[int], stats: Optional[SolverStats]) -> None:
+        """Undoes _choose(r), uncovering the columns in reverse order."""
+        L, C = self.L, self.C
+        j = L[r]
+        while j != r:
+            self.uncover(C[j])
+            j = L[j]
+        solution.pop()
+        if stats is not None:
+            cell, digit = divmod(self.ROW[r], self.size)
+            stats.undo(cell // self.size, cell % self.size, digit + 1)
+
+    def search(self, solution: List[int],
+               stats: Optional[SolverStats] = None) -> Iterator[List[int]]:
+        """
+        Yields the list of chosen row ids each time an exact cover is found.
+        The same list is reused and mutated between yields.
+        When stats are given, each chosen row is reported as a place/undo event.
+        Uses an explicit stack instead of recursion, so large boards cannot
+        hit the recursion limit.
+        """
+        R, D, S = self.R, self.D, self.S
+        # Each frame: [covered column, row currently chosen from it]
+        stack = []
+        while True:
+            if R[0] == 0:
+                yield solution
+            else:
+                # Branch on the column with the fewest remaining rows
+                c, best = R[0], S[R[0]]
+                j = R[c]
+                while j != 0 and best > 1:
+                    if S[j] < best:
+                        c, best = j, S[j]
+                    j = R[j]
+                if best > 0:
+                    self.cover(c)
+                    stack.append([c, D[c]])
+                    self._choose(D[c], solution, stats)
+                    continue
+
+            # Dead end or solution reported: move to the next row of the deepest column left
+            while stack:
+                frame = stack[-1]
+                c, r = frame
+                self._unchoose(r, solution, stats)
+                r = D[r]
+                if r != c:
+                    frame[1] = r
+                    self._choose(r, solution, stats)
+                    break
+                stack.pop()
+                self.uncover(c)
+            else:
+                return
+
+
+def _iter_covers(board: Board, stats: Optional[SolverStats] = None) -> Iterator[List[int]]:
+    """
+    Yields the row ids of each solution of the board, lazily.
+    With stats, the time spent finding each solution is added to the
+    "search" phase; time the caller spends between solutions is not.
+    Raises ValueError if the board dimensions are invalid.
+    """
+    box = box_size(board)
+    if stats is None:
+        links = _DancingLinks(box)
+        if links.apply_clues(board):
+            yield from links.search([])
+        return
+
+    with stats.phase("setup"):
+        links = _DancingLinks(box)
+        valid = links.apply_clues(board)
+    if not valid:
+        return
+    covers = links.search([], stats)
+    while True:
+        with stats.phase("search"):
+            rows = next(covers, None)
+        if rows is None:
+            return
+        yield rows
+
+
+def _fill(board: Board, rows: List[int]) -> None:
+    """Writes the placements given by exact-cover row ids into the board."""
+    n = len(board)
+    for row_id in rows:
+        cell, digit = divmod(row_id, n)
+        board[cell // n][cell % n] = digit + 1
+
+
+def enumerate_solutions(board: Board, stats: Optional[SolverStats] = None) -> Iterator[Board]:
+    """
+    Generates every solution of the puzzle using Dancing Links.
+    Solutions are produced one at a time and never collected in memory.
+    The input board is not modified; each solution is a new board.
+    """
+    for rows in _iter_covers(board, stats):
+        solution = [row[:] for row in board]
+        _fill(solution, rows)
+        yield solution
+
+
+def count_solutions(board: Board, limit: Optional[int] = 2,
+                    stats: Optional[SolverStats] = None) -> int:
+    """
+    Counts the solutions of the puzzle, stopping once limit is reached.
+    With the default limit of 2, a result of 1 means the puzzle is unique.
+    Pass limit=None to count every solution.
+    """
+    count = 0
+    for _ in _iter_covers(board, stats):
+        count += 1
+        if limit is not None and count >= limit:
+            break
+    return count
+
+
+def solve_dlx(board: Board, stats: Optional[SolverStats] = None) -> bool:
+    """
+    Solves the Sudoku puzzle as an exact-cover problem with Dancing Links.
+    Modifies the board in-place; fills stats if given.
+    Returns True if a solution is found, False if the puzzle is unsolvable.
+    """
+    rows = next(_iter_covers(board, stats), None)
+    if rows is None:
+        return False
+    _fill(board, rows)
+    return True
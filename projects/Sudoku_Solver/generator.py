@@ -0,0 +1,170 @@
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, Tuple
+
+from batch import board_to_line
+from bitmask_solver import solve_bitmask
+from main import Board
+from solver_stats import SolverStats
+
+# Difficulty grades, from easiest to hardest
+DIFFICULTIES = ("easy", "medium", "hard", "expert")
+
+# Puzzles needing more search nodes than this are graded expert
+HARD_NODE_LIMIT = 10
+
+
+def _shuffle_grid(grid: Board, rng: random.Random) -> Board:
+    """
+    Applies random validity-preserving symmetries to a solved grid:
+    digit relabelling, row and column swaps within bands and stacks,
+    band and stack swaps, and transposition.
+    """
+    relabel = [0] + rng.sample(range(1, 10), 9)
+    bands = rng.sample(range(3), 3)
+    stacks = rng.sample(range(3), 3)
+    rows = [3 * band + r for band in bands for r in rng.sample(range(3), 3)]
+    cols = [3 * stack + c for stack in stacks for c in rng.sample(range(3), 3)]
+    shuffled = [[relabel[grid[r][c]] for c in cols] for r in rows]
+    if rng.random() < 0.5:
+        shuffled = [list(col) for col in zip(*shuffled)]
+    return shuffled
+
+
+def generate_grid(rng: random.Random) -> Board:
+    """
+    Creates a random, completely filled valid grid.
+    The three diagonal boxes are independent, so they are filled with random
+    permutations and the rest is completed by the solver, then shuffled.
+    """
+    grid = [[0] * 9 for _ in range(9)]
+    for box in range(3):
+        for i, num in enumerate(rng.sample(range(1, 10), 9)):
+            grid[3 * box + i // 3][3 * box + i % 3] = num
+    solve_bitmask(grid)
+    return _shuffle_grid(grid, rng)
+
+
+def _has_other_solution(puzzle: Board, row: int, col: int, original: int) -> bool:
+    """
+    Checks whether the empty cell at (row, col) can hold any digit other than
+    original in some solution of the puzzle.
+    """
+    for num in range(1, 10):
+        if num == original:
+            continue
+        trial = [r[:] for r in puzzle]
+        trial[row][col] = num
+        if solve_bitmask(trial):
+            return True
+    return False
+
+
+def remove_clues(grid: Board, rng: random.Random, symmetric: bool = True,
+                 min_clues: int = 17) -> Board:
+    """
+    Removes clues from a solved grid in random order while the puzzle keeps
+    a unique solution.
+    A removal is kept only if none of the cleared cells can take another digit,
+    which, given the puzzle was unique before, proves it is still unique.
+    With symmetric=True, clues are removed in pairs mirrored about the centre.
+    """
+    puzzle = [row[:] for row in grid]
+    clues = 81
+    order = list(range(81))
+    rng.shuffle(order)
+    for i in order:
+        group = {i, 80 - i} if symmetric else {i}
+        if not puzzle[i // 9][i % 9] or clues - len(group) < min_clues:
+            continue
+        for j in group:
+            puzzle[j // 9][j % 9] = 0
+        if any(_has_other_solution(puzzle, j // 9, j % 9, grid[j // 9][j % 9]) for j in group):
+            for j in group:
+                puzzle[j // 9][j % 9] = grid[j // 9][j % 9]
+        else:
+            clues -= len(group)
+    return puzzle
+
+
+def grade_puzzle(puzzle: Board) -> Tuple[str, SolverStats]:
+    """
+    Grades a puzzle by the techniques the bitmask engine needed to solve it.
+    easy: naked singles only; medium: hidden singles as well;
+    hard: a few guesses; expert: more than HARD_NODE_LIMIT search nodes.
+    Returns the grade and the engine's stats.
+    """
+    stats = SolverStats()
+    solve_bitmask([row[:] for row in puzzle], stats)
+    if stats.nodes > HARD_NODE_LIMIT:
+        grade = "expert"
+    elif stats.nodes:
+        grade = "hard"
+    elif stats.hidden_singles:
+        grade = "medium"
+    else:
+        grade = "easy"
+    return grade, stats
+
+
+def generate_puzzle(seed: int, index: int = 0, symmetric: bool = True,
+                    min_clues: int = 17) -> Tuple[Board, str]:
+    """
+    Generates one puzzle with a unique solution and grades it.
+    The result depends only on (seed, index), so a numbered sequence of
+    puzzles is reproducible no matter how it is split across processes.
+    Returns the puzzle and its difficulty grade.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    puzzle = remove_clues(generate_grid(rng), rng, symmetric, min_clues)
+    grade, _ = grade_puzzle(puzzle)
+    return puzzle, grade
+
+
+def _generate_one(args: Tuple[int, int, bool, int]) -> Tuple[Board, str]:
+    """Worker entry point for generate_puzzles."""
+    return generate_puzzle(*args)
+
+
+def generate_puzzles(count: int, seed: int = 0, workers: Optional[int] = None,
+                     symmetric: bool = True, min_clues: int = 17,
+                     chunk_size: int = 16) -> Iterator[Tuple[Board, str]]:
+    """
+    Generates count unique puzzles across a process pool.
+    Puzzle i is generate_puzzle(seed, i), so output is reproducible from the seed.
+    Yields (puzzle, grade) tuples in order.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = ((seed, index, symmetric, min_clues) for index in range(count))
+    if workers == 1:
+        yield from map(_generate_one, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_generate_one, jobs, chunksize=chunk_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles with unique solutions.")
+    parser.add_argument("count", type=int)
+    parser.add_argument("output_file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--min-clues", type=int, default=17)
+    parser.add_argument("--asymmetric", action="store_true",
+                        help="remove clues one at a time instead of in mirrored pairs")
+    args = parser.parse_args()
+
+    grades = {grade: 0 for grade in DIFFICULTIES}
+    with open(args.output_file, 'w') as f:
+        puzzles = generate_puzzles(args.count, args.seed, args.workers,
+                                   not args.asymmetric, args.min_clues)
+        for puzzle, grade in puzzles:
+            # One 81-character line per puzzle, readable by batch.iter_puzzles
+            f.write(board_to_line(puzzle) + "\n")
+            grades[grade] += 1
+
+    summary = ", ".join(f"{grades[grade]} {grade}" for grade in DIFFICULTIES)
+    print(f"Generated {args.count} puzzles ({summary}). Written to {args.output_file}")
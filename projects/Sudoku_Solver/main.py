@@ -1,24 +1,34 @@
+import argparse
+import json
+from contextlib import nullcontext
+from math import isqrt
 from typing import List, Tuple, Optional
 
-# Type alias for a 9x9 Sudoku board
+from bitmask_solver import solve_bitmask
+from dlx_solver import solve_dlx
+from solver_stats import SolverStats
+
+# Type alias for an N x N Sudoku board (9x9 by default; 16x16, 25x25, ... also work)
 Board = List[List[int]]  
 
 
 def read_board_from_file(filename: str) -> Board:
     """
     Reads a Sudoku puzzle from a text file.
-    Each line in the file should contain 9 comma-separated integers.
-    Returns a 9x9 board as a list of lists of integers.
+    Each line in the file should contain N comma-separated integers, where N
+    is a perfect square (9 for a classic puzzle, 16, 25, ...).
+    Returns an N x N board as a list of lists of integers.
     Raises ValueError if the board dimensions are invalid.
     """
     board = []
     with open(filename, 'r') as f:
         for line in f:
             row = list(map(int, line.strip().split(',')))
-            if len(row) != 9:
+            size = len(board[0]) if board else len(row)
+            if len(row) != size or isqrt(size) ** 2 != size:
                 raise ValueError(f"Invalid row length: {row}")
             board.append(row)
-    if len(board) != 9:
+    if not board or len(board) != len(board[0]):
         raise ValueError("Invalid board height.")
     return board
 
@@ -36,26 +46,28 @@ def write_board_to_file(board: Board, filename: str) -> None:
 def is_valid_board(board: Board) -> bool:
     """
     Checks whether the initial board has any conflicting numbers.
-    Ensures no duplicates in any row, column, or 3x3 subgrid.
+    Ensures no duplicates in any row, column, or subgrid (3x3 on a 9x9 board).
     Returns True if the board is valid, False otherwise.
     """
-    for i in range(9):
+    size = len(board)
+    box = isqrt(size)
+    for i in range(size):
         # Check for duplicate numbers in each row
         row = [num for num in board[i] if num != 0]
         if len(row) != len(set(row)):
             return False
         # Check for duplicate numbers in each column
-        col = [board[r][i] for r in range(9) if board[r][i] != 0]
+        col = [board[r][i] for r in range(size) if board[r][i] != 0]
         if len(col) != len(set(col)):
             return False
 
-    # Check for duplicate numbers in each 3x3 subgrid
-    for box_row in range(3):
-        for box_col in range(3):
+    # Check for duplicate numbers in each subgrid
+    for box_row in range(box):
+        for box_col in range(box):
             nums = []
-            for i in range(3):
-                for j in range(3):
-                    num = board[box_row*3 + i][box_col*3 + j]
+            for i in range(box):
+                for j in range(box):
+                    num = board[box_row*box + i][box_col*box + j]
                     if num != 0:
                         nums.append(num)
             if len(nums) != len(set(nums)):
@@ -70,8 +82,8 @@ def find_empty(board: Board) -> Optional[Tuple[int, int]]:
     Returns a tuple (row, col) of the empty cell's position.
     Returns None if no empty cells are left.
     """
-    for i in range(9):
-        for j in range(9):
+    for i in range(len(board)):
+        for j in range(len(board)):
             if board[i][j] == 0:
                 return (i, j)
     return None
@@ -80,33 +92,40 @@ def find_empty(board: Board) -> Optional[Tuple[int, int]]:
 def is_valid_move(board: Board, row: int, col: int, num: int) -> bool:
     """
     Checks whether placing a number at a specific cell is valid.
-    Ensures no conflicts in the corresponding row, column, or 3x3 subgrid.
+    Ensures no conflicts in the corresponding row, column, or subgrid.
     Returns True if the move is allowed, False otherwise.
     """
+    size = len(board)
+    box = isqrt(size)
+
     # Check row
-    if any(board[row][x] == num for x in range(9)):
+    if any(board[row][x] == num for x in range(size)):
         return False
 
     # Check column
-    if any(board[y][col] == num for y in range(9)):
+    if any(board[y][col] == num for y in range(size)):
         return False
 
-    # Check 3x3 subgrid
-    box_start_row, box_start_col = 3 * (row // 3), 3 * (col // 3)
-    for i in range(3):
-        for j in range(3):
+    # Check subgrid
+    box_start_row, box_start_col = box * (row // box), box * (col // box)
+    for i in range(box):
+        for j in range(box):
             if board[box_start_row + i][box_start_col + j] == num:
                 return False
 
     return True
 
 
-def solve_sudoku(board: Board) -> bool:
+def solve_sudoku(board: Board, stats: Optional[SolverStats] = None) -> bool:
     """
     Solves the Sudoku puzzle using a recursive backtracking algorithm.
-    Modifies the board in-place.
+    Modifies the board in-place; fills stats if given.
     Returns True if a solution is found, False if the puzzle is unsolvable.
     """
+    if stats is not None:
+        with stats.phase("search"):
+            return _solve_traced(board, stats, 0)
+
     empty = find_empty(board)
     if not empty:
         # No empty cells left; puzzle is solved
@@ -114,7 +133,7 @@ def solve_sudoku(board: Board) -> bool:
 
     row, col = empty
 
-    for num in range(1, 10):
+    for num in range(1, len(board) + 1):
         if is_valid_move(board, row, col, num):
             board[row][col] = num  # Tentatively place number
 
@@ -127,28 +146,104 @@ def solve_sudoku(board: Board) -> bool:
     return False
 
 
+def _solve_traced(board: Board, stats: SolverStats, depth: int) -> bool:
+    """
+    Same search as solve_sudoku, but records every placement and undo.
+    Kept separate so the uninstrumented path pays nothing for stats.
+    """
+    empty = find_empty(board)
+    if not empty:
+        return True
+
+    row, col = empty
+
+    for num in range(1, len(board) + 1):
+        if is_valid_move(board, row, col, num):
+            board[row][col] = num
+            stats.place(row, col, num, depth + 1)
+
+            if _solve_traced(board, stats, depth + 1):
+                return True
+
+            board[row][col] = 0
+            stats.undo(row, col, num)
+
+    return False
+
+
+# Solver engines selectable by name; each one solves the board in-place
+# and accepts an optional SolverStats to fill
+ENGINES = {
+    "backtrack": solve_sudoku,
+    "bitmask": solve_bitmask,
+    "dlx": solve_dlx,
+}
+
+
+def solve(board: Board, engine: str = "backtrack",
+          stats: Optional[SolverStats] = None) -> bool:
+    """
+    Solves the Sudoku puzzle with the named engine.
+    Modifies the board in-place; fills stats if given.
+    Returns True if a solution is found, False if the puzzle is unsolvable.
+    Raises ValueError if the engine name is unknown.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown solver engine: {engine}")
+    return ENGINES[engine](board, stats)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a Sudoku puzzle from a text file.")
+    parser.add_argument("input_file", nargs="?", default="sudoku_input3.txt")
+    parser.add_argument("output_file", nargs="?", default="sudoku_output3.txt")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="backtrack",
+                        help="solver engine to use (default: backtrack)")
+    parser.add_argument("--stats", nargs="?", const="-", metavar="FILE",
+                        help="dump solver stats as JSON to FILE (or stdout)")
+    args = parser.parse_args()
+
     # Input and output file names
-    input_file = "sudoku_input3.txt"
-    output_file = "sudoku_output3.txt"
+    input_file = args.input_file
+    output_file = args.output_file
+
+    # Stats are only collected when asked for, so normal runs stay uninstrumented
+    stats = SolverStats() if args.stats else None
+
+    def phase(name):
+        return stats.phase(name) if stats is not None else nullcontext()
 
     try:
         # Read the puzzle from input file
-        puzzle = read_board_from_file(input_file)
+        with phase("read"):
+            puzzle = read_board_from_file(input_file)
     except Exception as e:
         print(f"Failed to read puzzle: {e}")
         exit(1)
 
     # Validate the initial puzzle for conflicts
-    if not is_valid_board(puzzle):
+    with phase("validate"):
+        valid = is_valid_board(puzzle)
+    if not valid:
         print("Invalid Sudoku puzzle — conflicting numbers detected.")
         exit(1)
 
     # Attempt to solve the puzzle
-    if solve_sudoku(puzzle):
+    solved = solve(puzzle, args.engine, stats)
+    if solved:
         # Write the solved puzzle to output file
-        write_board_to_file(puzzle, output_file)
+        with phase("write"):
+            write_board_to_file(puzzle, output_file)
         print(f"Puzzle solved successfully! Solution written to {output_file}")
     else:
         # No solution exists for the given puzzle
         print("No solution exists for the provided puzzle.")
+
+    if stats is not None:
+        report = {"input_file": input_file, "engine": args.engine, "solved": solved}
+        report.update(stats.to_dict())
+        if args.stats == "-":
+            print(json.dumps(report, indent=4))
+        else:
+            with open(args.stats, 'w') as f:
+                json.dump(report, f, indent=4)
@@ -0,0 +1,183 @@
+import argparse
+import mmap
+import struct
+from typing import Iterable, Iterator
+
+from batch import board_to_line, iter_puzzles
+from compact_board import CompactBoard
+from main import Board
+
+# File layout: a 16-byte header followed by fixed-size records, one byte per cell.
+# Header fields: magic, format version, box size, record size, puzzle count.
+HEADER = struct.Struct("<4sBBHQ")
+MAGIC = b"SDKB"
+VERSION = 1
+BOX_SIZE = 3
+RECORD_SIZE = 81
+
+
+def is_store(filename: str) -> bool:
+    """Returns True if the file starts with the binary puzzle store magic."""
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_store(filename: str, boards: Iterable[Board]) -> int:
+    """
+    Streams boards into a binary puzzle store, one 81-byte record each.
+    The puzzle count in the header is filled in once all boards are written.
+    Returns the number of puzzles written.
+    """
+    count = 0
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BOX_SIZE, RECORD_SIZE, 0))
+        for board in boards:
+            f.write(CompactBoard.from_rows(board).cells)
+            count += 1
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, BOX_SIZE, RECORD_SIZE, count))
+    return count
+
+
+class PuzzleStore:
+    """
+    Read-only, memory-mapped view of a binary puzzle store.
+    Puzzles are random-accessed by index and paged in by the OS on demand,
+    so iterating a large dataset never loads the whole file.
+    """
+
+    def __init__(self, filename: str):
+        """
+        Opens and maps the store.
+        Raises ValueError if the file is not a valid puzzle store.
+        """
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Not a puzzle store: {filename}")
+        try:
+            if len(self._map) < HEADER.size:
+                raise ValueError(f"Not a puzzle store: {filename}")
+            magic, version, box_size, record_size, count = HEADER.unpack_from(self._map)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a puzzle store: {filename}")
+            if box_size != BOX_SIZE or record_size != RECORD_SIZE:
+                raise ValueError(f"Unsupported puzzle size in {filename}")
+            if len(self._map) < HEADER.size + count * RECORD_SIZE:
+                raise ValueError(f"Truncated puzzle store: {filename}")
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        self._count = count
+
+    def close(self) -> None:
+        """
+        Closes the store. Views from records() and boards from store[i] that
+        are still alive keep the mapping valid; it is unmapped once the last
+        of them is garbage-collected.
+        """
+        try:
+            self._map.close()
+        except BufferError:
+            # Exported views still point into the mapping
+            pass
+        self._file.close()
+
+    def __enter__(self) -> "PuzzleStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def records(self) -> memoryview:
+        """
+        Returns a read-only memoryview over all records, without copying.
+        Suitable for vectorized.boards_from_buffer; the arrays it gives are
+        read-only too and stay valid after the store is closed.
+        """
+        start = HEADER.size
+        return memoryview(self._map)[start:start + self._count * RECORD_SIZE]
+
+    def __getitem__(self, index: int) -> CompactBoard:
+        """
+        Returns the puzzle at index as a read-only board backed by the mapped
+        file; use its copy() to get a board that can be modified.
+        Raises IndexError if the index is out of range.
+        """
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Puzzle index out of range.")
+        start = HEADER.size + index * RECORD_SIZE
+        return CompactBoard(memoryview(self._map)[start:start + RECORD_SIZE])
+
+    def __iter__(self) -> Iterator[CompactBoard]:
+        for index in range(self._count):
+            yield self[index]
+
+    def iter_boards(self) -> Iterator[Board]:
+        """Lazily yields each puzzle in the list-of-lists format."""
+        for board in self:
+            yield board.to_rows()
+
+
+def convert_to_store(text_file: str, store_file: str) -> int:
+    """
+    Converts a text puzzle file (81-character lines or 9-line CSV blocks)
+    into a binary puzzle store, streaming one puzzle at a time.
+    Returns the number of puzzles converted.
+    """
+    return write_store(store_file, iter_puzzles(text_file))
+
+
+def convert_from_store(store_file: str, text_file: str, fmt: str = "line") -> int:
+    """
+    Converts a binary puzzle store back to text, streaming one puzzle at a time.
+    fmt is "line" for one 81-character line per puzzle, or "csv" for the
+    9-line comma-separated format with a blank line between puzzles.
+    Returns the number of puzzles converted.
+    """
+    if fmt not in ("line", "csv"):
+        raise ValueError(f"Unknown text format: {fmt}")
+    count = 0
+    with PuzzleStore(store_file) as store, open(text_file, 'w') as f:
+        for board in store.iter_boards():
+            if fmt == "line":
+                f.write(board_to_line(board) + "\n")
+            else:
+                if count:
+                    f.write("\n")
+                for row in board:
+                    f.write(",".join(str(num) for num in row) + "\n")
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert between text puzzle files and the binary puzzle store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    pack = subparsers.add_parser("pack", help="text file -> binary store")
+    pack.add_argument("text_file")
+    pack.add_argument("store_file")
+    unpack = subparsers.add_parser("unpack", help="binary store -> text file")
+    unpack.add_argument("store_file")
+    unpack.add_argument("text_file")
+    unpack.add_argument("--format", choices=["line", "csv"], default="line")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "pack":
+            count = convert_to_store(args.text_file, args.store_file)
+            print(f"Packed {count} puzzles into {args.store_file}")
+        else:
+            count = convert_from_store(args.store_file, args.text_file, args.format)
+            print(f"Unpacked {count} puzzles into {args.text_file}")
+    except (OSError, ValueError) as e:
+        print(f"Conversion failed: {e}")
+        exit(1)
@@ -0,0 +1,66 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+# Callback signature: on_event(event, row, col, num), where event is "place" or "undo"
+EventHook = Callable[[str, int, int, int], None]
+
+
+class SolverStats:
+    """
+    Counters and timings collected during one solver run.
+    Instrumentation is opt-in: engines only do this bookkeeping when a
+    SolverStats instance is passed in, and run their plain code path otherwise.
+
+    nodes:          tentative placements tried by the search
+    backtracks:     tentative placements undone
+    max_depth:      deepest level of nested placements reached
+    naked_singles:  cells filled by naked-single propagation (bitmask engine)
+    hidden_singles: cells filled by hidden-single propagation (bitmask engine)
+    phase_times:    seconds spent in each named phase
+    on_event:       optional hook fired on every search place/undo event
+    """
+
+    def __init__(self, on_event: Optional[EventHook] = None):
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.naked_singles = 0
+        self.hidden_singles = 0
+        self.phase_times: Dict[str, float] = {}
+        self.on_event = on_event
+
+    def place(self, row: int, col: int, num: int, depth: int) -> None:
+        """Records a tentative placement at the given search depth."""
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.on_event is not None:
+            self.on_event("place", row, col, num)
+
+    def undo(self, row: int, col: int, num: int) -> None:
+        """Records that a tentative placement was taken back."""
+        self.backtracks += 1
+        if self.on_event is not None:
+            self.on_event("undo", row, col, num)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Adds the wall-clock time spent inside the block to the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + elapsed
+
+    def to_dict(self) -> Dict[str, object]:
+        """Returns the counters and phase timings as a JSON-serializable dict."""
+        return {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "naked_singles": self.naked_singles,
+            "hidden_singles": self.hidden_singles,
+            "phase_times": dict(self.phase_times),
+        }
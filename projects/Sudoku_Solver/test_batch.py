@@ -0,0 +1,26 @@
+from batch import INVALID, board_to_line, format_result, solve_batch
+from bitmask_solver import SOLVED
+
+PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+SOLUTION = "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+
+
+def board(line):
+    return [[int(ch) for ch in line[r * 9:r * 9 + 9]] for r in range(9)]
+
+
+def test_out_of_range_cells_are_invalid_without_stopping_the_batch():
+    out_of_range = board(PUZZLE)
+    out_of_range[0][8] = 10
+    for workers in (1, 2):
+        results = list(solve_batch([board(PUZZLE), out_of_range, board(PUZZLE)], workers=workers, chunk_size=1))
+        assert [(index, status) for index, status, _ in results] == [(0, SOLVED), (1, INVALID), (2, SOLVED)]
+        assert board_to_line(results[0][2]) == SOLUTION
+        assert results[1][2] == out_of_range
+
+
+def test_result_lines_leave_unwritable_boards_empty():
+    out_of_range = board(PUZZLE)
+    out_of_range[0][8] = 10
+    assert format_result(0, SOLVED, board(SOLUTION)) == f"0,{SOLVED},{SOLUTION}\n"
+    assert format_result(1, INVALID, out_of_range) == f"1,{INVALID},\n"
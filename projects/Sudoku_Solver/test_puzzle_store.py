@@ -0,0 +1,53 @@
+import pytest
+
+from puzzle_store import PuzzleStore, write_store
+from vectorized import boards_from_buffer
+
+PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+
+
+def board(line):
+    return [[int(ch) for ch in line[r * 9:r * 9 + 9]] for r in range(9)]
+
+
+def make_store(tmp_path, count=3):
+    filename = str(tmp_path / "puzzles.sdkb")
+    write_store(filename, [board(PUZZLE)] * count)
+    return filename
+
+
+def test_close_with_views_still_alive(tmp_path):
+    with PuzzleStore(make_store(tmp_path)) as store:
+        boards = boards_from_buffer(store.records())
+        first = store[0]
+    # The views keep the mapping alive after the store is closed
+    assert boards.shape == (3, 9, 9)
+    assert first.to_rows() == board(PUZZLE)
+
+
+def test_boards_from_the_store_are_read_only(tmp_path):
+    with PuzzleStore(make_store(tmp_path)) as store:
+        stored = store[1]
+        assert stored.read_only
+        with pytest.raises(TypeError):
+            stored[0, 2] = 4
+        editable = stored.copy()
+        assert not editable.read_only
+        editable[0, 2] = 4
+        assert editable[0, 2] == 4 and stored[0, 2] == 0
+
+
+@pytest.mark.parametrize("contents", [b"", b"abc", b"SDKBxx"])
+def test_file_shorter_than_the_header_is_not_a_store(tmp_path, contents):
+    filename = tmp_path / "short.sdkb"
+    filename.write_bytes(contents)
+    with pytest.raises(ValueError, match="Not a puzzle store"):
+        PuzzleStore(str(filename))
+
+
+def test_truncated_records_are_rejected(tmp_path):
+    filename = make_store(tmp_path)
+    with open(filename, "r+b") as f:
+        f.truncate(16 + 81 * 2)
+    with pytest.raises(ValueError, match="Truncated puzzle store"):
+        PuzzleStore(filename)
@@ -0,0 +1,36 @@
+import pytest
+
+from dlx_solver import count_solutions
+from main import solve
+from solver_stats import SolverStats
+
+
+def is_solution(board):
+    n = len(board)
+    box = int(n ** 0.5)
+    digits = list(range(1, n + 1))
+    units = [board[r] for r in range(n)]
+    units += [[board[r][c] for r in range(n)] for c in range(n)]
+    units += [[board[r][c] for r in range(br, br + box) for c in range(bc, bc + box)]
+              for br in range(0, n, box) for bc in range(0, n, box)]
+    return all(sorted(unit) == digits for unit in units)
+
+
+@pytest.mark.parametrize("engine", ["bitmask", "dlx"])
+def test_deep_searches_do_not_hit_the_recursion_limit(engine):
+    # An empty 36x36 board needs more nested guesses than the default recursion limit allows
+    board = [[0] * 36 for _ in range(36)]
+    assert solve(board, engine)
+    assert is_solution(board)
+
+
+def test_dlx_counts_every_solution_of_an_empty_4x4_board():
+    assert count_solutions([[0] * 4 for _ in range(4)], limit=None) == 288
+
+
+@pytest.mark.parametrize("engine", ["backtrack", "bitmask", "dlx"])
+def test_every_engine_reports_search_time(engine):
+    board = [[0] * 9 for _ in range(9)]
+    stats = SolverStats()
+    assert solve(board, engine, stats)
+    assert "search" in stats.phase_times
@@ -0,0 +1,63 @@
+import numpy as np
+
+# Boards validated per bincount pass; bounds the size of the count tables
+CHUNK_SIZE = 65536
+
+
+def boards_from_buffer(buffer) -> np.ndarray:
+    """
+    Views a contiguous buffer of 81-byte boards (see compact_board.pack_boards)
+    as an (N, 9, 9) uint8 array, without copying.
+    """
+    return np.frombuffer(buffer, dtype=np.uint8).reshape(-1, 9, 9)
+
+
+def _units_have_duplicates(units: np.ndarray) -> np.ndarray:
+    """
+    Takes an (N, 9, 9) array whose second axis lists the 9 units of each
+    board, and counts every digit per unit with a single bincount.
+    Returns an (N,) mask of boards where some unit holds a digit twice.
+    """
+    n = units.shape[0]
+    # Give every (board, unit, digit) triple its own bin
+    offsets = (np.arange(n * 9, dtype=np.int64) * 10).reshape(n, 9, 1)
+    counts = np.bincount((units + offsets).ravel(), minlength=n * 90)
+    counts = counts.reshape(n, 9, 10)[:, :, 1:]
+    return (counts > 1).any(axis=(1, 2))
+
+
+def _validate_chunk(boards: np.ndarray) -> np.ndarray:
+    n = boards.shape[0]
+    boards = boards.astype(np.int64)
+    in_range = ((boards >= 0) & (boards <= 9)).all(axis=(1, 2))
+    boards = np.where(in_range[:, None, None], boards, 0)
+
+    rows = boards
+    cols = boards.transpose(0, 2, 1)
+    boxes = boards.reshape(n, 3, 3, 3, 3).transpose(0, 1, 3, 2, 4).reshape(n, 9, 9)
+
+    invalid = _units_have_duplicates(rows)
+    invalid |= _units_have_duplicates(cols)
+    invalid |= _units_have_duplicates(boxes)
+    return in_range & ~invalid
+
+
+def validate_boards(boards: np.ndarray) -> np.ndarray:
+    """
+    Checks many boards at once for conflicting numbers.
+    Accepts an (N, 9, 9) or (N, 81) array of integers 0-9 (0 = empty).
+    Returns an (N,) boolean mask that is True for each board with no
+    duplicate digit in any row, column or 3x3 subgrid.
+    Raises ValueError if the array has the wrong shape.
+    """
+    boards = np.asarray(boards)
+    if boards.ndim == 2 and boards.shape[1] == 81:
+        boards = boards.reshape(-1, 9, 9)
+    if boards.ndim != 3 or boards.shape[1:] != (9, 9):
+        raise ValueError(f"Invalid boards shape: {boards.shape}")
+
+    valid = np.empty(boards.shape[0], dtype=bool)
+    for start in range(0, boards.shape[0], CHUNK_SIZE):
+        stop = start + CHUNK_SIZE
+        valid[start:stop] = _validate_chunk(boards[start:stop])
+    return valid
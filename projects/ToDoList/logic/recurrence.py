@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+from functools import lru_cache
+
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+def parse_date(text):
+    return date(int(text[:4]), int(text[5:7]), int(text[8:10]))
+
+
+class WeeklyRule:
+    # An RRULE-style weekly rule: FREQ=WEEKLY with INTERVAL, BYDAY, COUNT and UNTIL.
+    # Occurrences are numbered from 0 at the start date. Both directions of the
+    # index <-> date mapping are plain arithmetic, so no occurrence list is ever built.
+    def __init__(self, start, weekdays=None, interval=1, count=None, until=None):
+        self.start = start
+        self.weekdays = sorted(set(weekdays)) if weekdays else [start.weekday()]
+        self.interval = interval
+        self.count = count
+        self.until = until
+        # Week 0 is the Monday-based week holding the start date; its days before the start are skipped
+        self.week0 = start - timedelta(days=start.weekday())
+        self.skipped = sum(1 for weekday in self.weekdays if weekday < start.weekday())
+
+    @classmethod
+    def parse(cls, text, start):
+        parts = dict(part.split('=', 1) for part in text.split(';') if part)
+        if parts.get('FREQ', 'WEEKLY') != 'WEEKLY':
+            raise ValueError(f"Unsupported recurrence: {text}")
+        weekdays = [WEEKDAYS.index(day) for day in parts['BYDAY'].split(',')] if 'BYDAY' in parts else None
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+        until = parse_date(parts['UNTIL'][:4] + '-' + parts['UNTIL'][4:6] + '-' + parts['UNTIL'][6:8]) if 'UNTIL' in parts else None
+        return cls(start, weekdays, int(parts.get('INTERVAL', 1)), count, until)
+
+    def __str__(self):
+        text = f"FREQ=WEEKLY;INTERVAL={self.interval};BYDAY={','.join(WEEKDAYS[day] for day in self.weekdays)}"
+        if self.count is not None:
+            text += f";COUNT={self.count}"
+        if self.until is not None:
+            text += f";UNTIL={self.until.strftime('%Y%m%d')}"
+        return text
+
+    def _in_range(self, index, day):
+        if index < 0 or (self.count is not None and index >= self.count):
+            return False
+        return self.until is None or day <= self.until
+
+    def index_of(self, day):
+        week, weekday = divmod((day - self.week0).days, 7)
+        if week < 0 or week % self.interval or weekday not in self.weekdays:
+            return None
+        index = week // self.interval * len(self.weekdays) + self.weekdays.index(weekday) - self.skipped
+        return index if self._in_range(index, day) else None
+
+    def date_of(self, index):
+        period, position = divmod(index + self.skipped, len(self.weekdays))
+        return self.week0 + timedelta(weeks=period * self.interval, days=self.weekdays[position])
+
+    def occurs_on(self, day):
+        return self.index_of(day) is not None
+
+    def between(self, first, last):
+        # Lazily yields (index, date) for every occurrence from first to last inclusive
+        period = max(0, (first - self.week0).days // 7 // self.interval)
+        index = max(0, period * len(self.weekdays) - self.skipped)
+        while True:
+            day = self.date_of(index)
+            if day > last or not self._in_range(index, day):
+                return
+            if day >= first:
+                yield index, day
+            index += 1
+
+
+@lru_cache(maxsize=1024)
+def _parse_rule(text, start):
+    return WeeklyRule.parse(text, parse_date(start))
+
+
+def rule_for(task):
+    # Rules are looked up for every day the calendar paints, so parsed ones are kept
+    return _parse_rule(task['rrule'], task['due'])
+
+
+def normalize_task(task):
+    # Repeat tasks saved before rules existed: weekly on the due date's weekday, with the
+    # old completed_dates list turned into the occurrence bitmap
+    if task.get('repeat') and 'rrule' not in task:
+        rule = WeeklyRule(parse_date(task['due']))
+        task['rrule'] = str(rule)
+        bits = 0
+        for completed in task.get('completed_dates', []):
+            index = rule.index_of(parse_date(completed))
+            if index is not None:
+                bits |= 1 << index
+        task['completed_occurrences'] = bits
+        task.pop('completed_dates', None)
+    return task
+
+
+def is_occurrence_done(task, index):
+    return bool(task.get('completed_occurrences', 0) >> index & 1)
+
+
+def set_occurrence_done(task, index, done):
+    bits = task.get('completed_occurrences', 0)
+    task['completed_occurrences'] = bits | (1 << index) if done else bits & ~(1 << index)
+
+
+def completion_dates(task):
+    # The dates ('yyyy-MM-dd') on which the task counts as completed, for the history
+    if not task.get('repeat'):
+        return [task['due']] if task.get('complete') else []
+    rule = rule_for(task)
+    bits = task.get('completed_occurrences', 0)
+    dates = []
+    index = 0
+    while bits:
+        if bits & 1:
+            dates.append(rule.date_of(index).isoformat())
+        bits >>= 1
+        index += 1
+    return dates
@@ -0,0 +1,207 @@
+from bisect import bisect_left, insort
+from logic.recurrence import completion_dates, is_occurrence_done, normalize_task, parse_date, rule_for
+
+
+def title_words(title):
+    return set(title.lower().split())
+
+
+def is_pending(task, date):
+    if task.get('repeat'):
+        index = rule_for(task).index_of(parse_date(date))
+        return index is not None and not is_occurrence_done(task, index)
+    return not task.get('complete')
+
+
+def occurring_on(tasks, date, title=None):
+    # The repeat tasks among `tasks` with an occurrence on date
+    day = parse_date(date)
+    return [task for task in tasks
+            if (title is None or task['title'] == title) and rule_for(task).occurs_on(day)]
+
+
+class TaskIndex:
+    # Tasks keyed by a stable id, with secondary indexes so lookups never scan the whole history
+    def __init__(self):
+        self.tasks = {}
+        self.by_date = {}
+        self.by_title = {}
+        self.by_tag = {}
+        self.by_word = {}
+        self.words = []
+        # Repeat tasks by the weekdays their rule falls on; by_date and by_title only hold
+        # them under their start date, the days they occur on are worked out from the rule
+        self.by_weekday = [set() for _ in range(7)]
+        # id -> set of dates the task was completed on (one per completed occurrence)
+        self.completed = {}
+        self.completed_order = []
+        # New entries are appended and the lists sorted on the next read, so loading
+        # a large history does not pay for an insort per task
+        self.words_sorted = True
+        self.completed_sorted = True
+        self.next_id = 1
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def add(self, task):
+        normalize_task(task)
+        if task.get('id') is None:
+            task['id'] = self.next_id
+        task_id = task['id']
+        self.next_id = max(self.next_id, task_id + 1)
+        self.tasks[task_id] = task
+        self.by_date.setdefault(task['due'], {})[task_id] = task
+        if task.get('repeat'):
+            for weekday in rule_for(task).weekdays:
+                self.by_weekday[weekday].add(task_id)
+        else:
+            self.by_title.setdefault((task['due'], task['title']), []).append(task_id)
+        self.by_tag.setdefault(task['tag'], set()).add(task_id)
+        for word in title_words(task['title']):
+            if word not in self.by_word:
+                self.by_word[word] = set()
+                self.words.append(word)
+                self.words_sorted = False
+            self.by_word[word].add(task_id)
+        dates = completion_dates(task)
+        if dates:
+            self.completed[task_id] = set(dates)
+            self.completed_order.extend((date, task_id) for date in dates)
+            self.completed_sorted = False
+        return task_id
+
+    def remove(self, task_id):
+        task = self.tasks.pop(task_id)
+        day = self.by_date[task['due']]
+        del day[task_id]
+        if not day:
+            del self.by_date[task['due']]
+        if task.get('repeat'):
+            for weekday in rule_for(task).weekdays:
+                self.by_weekday[weekday].discard(task_id)
+        else:
+            key = (task['due'], task['title'])
+            self.by_title[key].remove(task_id)
+            if not self.by_title[key]:
+                del self.by_title[key]
+        self._discard(self.by_tag, task['tag'], task_id)
+        for word in title_words(task['title']):
+            if self._discard(self.by_word, word, task_id):
+                words = self.sorted_words()
+                del words[bisect_left(words, word)]
+        self._set_completed(task_id, [])
+        return task
+
+    def _discard(self, index, key, task_id):
+        # Returns True when the key no longer has any tasks and was dropped
+        ids = index[key]
+        ids.discard(task_id)
+        if not ids:
+            del index[key]
+            return True
+        return False
+
+    def _set_completed(self, task_id, dates):
+        # Only the dates that changed are moved in or out of the history order
+        old = self.completed.pop(task_id, set())
+        new = set(dates)
+        if new:
+            self.completed[task_id] = new
+        for date in old - new:
+            order = self.sorted_completed()
+            del order[bisect_left(order, (date, task_id))]
+        for date in new - old:
+            if self.completed_sorted:
+                insort(self.completed_order, (date, task_id))
+            else:
+                self.completed_order.append((date, task_id))
+
+    def sorted_words(self):
+        if not self.words_sorted:
+            self.words.sort()
+            self.words_sorted = True
+        return self.words
+
+    def sorted_completed(self):
+        if not self.completed_sorted:
+            self.completed_order.sort()
+            self.completed_sorted = True
+        return self.completed_order
+
+    def refresh_completion(self, task_id):
+        self._set_completed(task_id, completion_dates(self.tasks[task_id]))
+
+    def get(self, task_id):
+        return self.tasks.get(task_id)
+
+    def stored_on(self, date):
+        # Tasks by the date they are saved under, which for repeat tasks is their first occurrence
+        return list(self.by_date.get(date, {}).values())
+
+    def _repeating_on(self, date, title=None):
+        ids = self.by_weekday[parse_date(date).weekday()]
+        return occurring_on([self.tasks[task_id] for task_id in sorted(ids)], date, title)
+
+    def on_date(self, date):
+        tasks = [task for task in self.by_date.get(date, {}).values() if not task.get('repeat')]
+        return tasks + self._repeating_on(date)
+
+    def find(self, date, title):
+        return self.by_title.get((date, title), []) + [task['id'] for task in self._repeating_on(date, title)]
+
+    def repeating(self):
+        return [self.tasks[task_id] for task_id in sorted(set().union(*self.by_weekday))]
+
+    def with_tag(self, tag):
+        return self.by_tag.get(tag, set())
+
+    def matching(self, keyword):
+        # Every word of the keyword has to start some word of the title
+        ids = None
+        words = self.sorted_words()
+        for part in keyword.lower().split():
+            found = set()
+            position = bisect_left(words, part)
+            while position < len(words) and words[position].startswith(part):
+                found |= self.by_word[words[position]]
+                position += 1
+            ids = found if ids is None else ids & found
+            if not ids:
+                break
+        return ids
+
+    def completed_tasks(self, keyword='', tag=None, limit=None, offset=0, newest_first=False):
+        # (date, task) pairs, one per completed occurrence, ordered by date; limit and
+        # offset select one page of that order
+        end = None if limit is None else offset + limit
+        wanted = None
+        if tag is not None:
+            wanted = self.with_tag(tag)
+        if keyword.strip():
+            matches = self.matching(keyword)
+            wanted = matches if wanted is None else wanted & matches
+        if wanted is None:
+            order = self.sorted_completed()
+            if newest_first:
+                # Slice from the end so a page costs O(page), not a reversed copy of the history
+                stop = len(order) - offset
+                start = 0 if end is None else max(0, len(order) - end)
+                page = order[start:max(0, stop)][::-1]
+            else:
+                page = order[offset:end]
+            return [(date, self.tasks[task_id]) for date, task_id in page]
+        # Walk whichever side is smaller
+        if len(wanted) < len(self.completed):
+            entries = sorted((date, task_id) for task_id in wanted for date in self.completed.get(task_id, ()))
+        else:
+            entries = [entry for entry in self.sorted_completed() if entry[1] in wanted]
+        if newest_first:
+            entries.reverse()
+        return [(date, self.tasks[task_id]) for date, task_id in entries[offset:end]]
+
+    def completed_tags(self):
+        return sorted(tag for tag, ids in self.by_tag.items() if not ids.isdisjoint(self.completed))
+
+    def dates(self):
+        return list(self.by_date)
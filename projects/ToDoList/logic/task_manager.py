@@ -1,25 +1,83 @@
-import json
-import os
+from calendar import monthrange
 from datetime import datetime
+from heapq import merge
+from logic.recurrence import WeeklyRule, parse_date, rule_for, set_occurrence_done
+from logic.task_index import is_pending
+from utils.storage import JournalStore
 
 class TaskManager:
-    def __init__(self, filename='tasks.json'):
+    def __init__(self, filename='tasks.json', storage=None):
         self.filename = filename
-        self.tasks = {}
+        self.storage = storage if storage is not None else JournalStore(filename)
         self.load_tasks()
 
     def load_tasks(self):
-        if os.path.exists(self.filename):
-            with open(self.filename, 'r') as f:
-                self.tasks = json.load(f)
-        else:
-            self.tasks = {}
+        self.index = self.storage.make_index()
+        # (year, month) -> bitmap with bit `day` set when that day has a pending task
+        self.busy_months = {}
+        missing_ids = False
+        for task in self.storage.load():
+            missing_ids = missing_ids or task.get('id') is None
+            self.index.add(task)
+        if missing_ids:
+            # Tasks saved before ids existed: write their new ids down before the journal refers to them
+            self.save_tasks()
 
     def save_tasks(self):
-        with open(self.filename, 'w') as f:
-            json.dump(self.tasks, f, indent=4)
+        self.storage.compact(self.index)
+
+    def _day_is_busy(self, date):
+        return any(is_pending(task, date) for task in self.index.on_date(date))
+
+    def _refresh_busy_day(self, date):
+        # Only the changed day of an already cached month is recomputed
+        key = (int(date[:4]), int(date[5:7]))
+        if key in self.busy_months:
+            bit = 1 << int(date[8:10])
+            if self._day_is_busy(date):
+                self.busy_months[key] |= bit
+            else:
+                self.busy_months[key] &= ~bit
+
+    def busy_days(self, year, month):
+        key = (year, month)
+        if key not in self.busy_months:
+            bits = 0
+            for day in range(1, monthrange(year, month)[1] + 1):
+                if self._day_is_busy(f"{year:04}-{month:02}-{day:02}"):
+                    bits |= 1 << day
+            self.busy_months[key] = bits
+        return self.busy_months[key]
+
+    def is_busy_day(self, year, month, day):
+        return bool(self.busy_days(year, month) >> day & 1)
+
+    def _refresh_busy_days(self, task, date=None):
+        # A repeat task can occur on any day, so a change to the task as a whole drops
+        # every cached month; completing one occurrence only touches its day
+        if task.get('repeat') and date is None:
+            self.busy_months.clear()
+        else:
+            self._refresh_busy_day(date or task['due'])
+
+    def _record_put(self, task, date=None):
+        self.storage.put(task)
+        self._refresh_busy_days(task, date)
+        if self.storage.needs_compaction(self.index):
+            self.save_tasks()
+
+    def _record_delete(self, task):
+        self.storage.delete(task['id'])
+        self._refresh_busy_days(task)
+        if self.storage.needs_compaction(self.index):
+            self.save_tasks()
 
-    def add_task(self, title, due_date, tag, description, repeat=False):
+    def update_task(self, task):
+        self._record_put(task)
+
+    def add_task(self, title, due_date, tag, description, repeat=False, rule=None):
+        # rule is an RRULE string such as 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH'; repeat tasks
+        # default to every week on the weekday of due_date
         task = {
             'title': title,
             'description': description,
@@ -28,46 +86,85 @@ class TaskManager:
             'complete': False,
             'due': due_date,
             'start': '',
-            'end': '',
-            'completed_dates': []
+            'end': ''
         }
-        if due_date not in self.tasks:
-            self.tasks[due_date] = []
-        self.tasks[due_date].append(task)
-        self.save_tasks()
+        if repeat:
+            task['rrule'] = rule or str(WeeklyRule(parse_date(due_date)))
+            # Bit i is set once occurrence i is done
+            task['completed_occurrences'] = 0
+        task_id = self.index.add(task)
+        if self.index is self.storage:
+            # A store that is its own index (SqliteStore) has already written the task
+            self._refresh_busy_days(task)
+        else:
+            self._record_put(task)
+        return task_id
+
+    def get_task(self, task_id):
+        return self.index.get(task_id)
+
+    def find_task(self, date, title):
+        ids = self.index.find(date, title)
+        return ids[0] if ids else None
 
     def get_tasks_by_date(self, date):
-        return self.tasks.get(date, [])
+        return self.index.on_date(date)
+
+    def get_occurrences(self, first_date, last_date):
+        # Lazily yields (date, task) for each occurrence of a repeat task between the two
+        # dates inclusive, in date order; nothing past what the caller consumes is generated
+        first, last = parse_date(first_date), parse_date(last_date)
+        streams = [self._occurrences(task, first, last) for task in self.index.repeating()]
+        for date, _, task in merge(*streams):
+            yield date, task
+
+    def _occurrences(self, task, first, last):
+        # One generator per task, so each stream keeps its own task
+        for _, day in rule_for(task).between(first, last):
+            yield day.isoformat(), task['id'], task
 
     def set_task_completion(self, date, title, complete):
-        if date in self.tasks:
-            for task in self.tasks[date]:
-                if task['title'] == title:
-                    task['complete'] = complete
-                    if complete and task['repeat']:
-                        if 'completed_dates' not in task:
-                            task['completed_dates'] = []
-                        task['completed_dates'].append(date)
-                    break
-        self.save_tasks()
+        task_id = self.find_task(date, title)
+        if task_id is not None:
+            self.set_completion(task_id, complete, date)
+
+    def set_completion(self, task_id, complete, date=None):
+        task = self.index.get(task_id)
+        if task is None:
+            return
+        date = date or task['due']
+        if task.get('repeat'):
+            # Completion is per occurrence; other weeks stay pending
+            index = rule_for(task).index_of(parse_date(date))
+            if index is None:
+                return
+            set_occurrence_done(task, index, complete)
+        else:
+            task['complete'] = complete
+        self.index.refresh_completion(task_id)
+        self._record_put(task, date)
 
     def delete_task(self, date, title):
-        if date in self.tasks:
-            self.tasks[date] = [task for task in self.tasks[date] if task['title'] != title]
-            if not self.tasks[date]:
-                del self.tasks[date]
-            self.save_tasks()
+        # For a repeat task this deletes the whole series
+        for task_id in self.index.find(date, title):
+            self._record_delete(self.index.remove(task_id))
 
-    def get_completed_tasks(self):
+    def delete_task_by_id(self, task_id):
+        if self.index.get(task_id) is not None:
+            self._record_delete(self.index.remove(task_id))
+
+    def get_tasks_by_tag(self, tag):
+        return [self.index.get(task_id) for task_id in self.index.with_tag(tag)]
+
+    def get_completed_tasks(self, keyword='', tag=None, limit=None, offset=0, newest_first=False):
+        # One entry per completed occurrence, with 'due' set to the day it was done for
         completed = []
-        for date, task_list in self.tasks.items():
-            for task in task_list:
-                if task['repeat'] and date in task.get('completed_dates', []):
-                    task_copy = task.copy()
-                    task_copy['due'] = date
-                    completed.append(task_copy)
-                elif not task['repeat'] and task['complete']:
-                    task_copy = task.copy()
-                    task_copy['due'] = date
-                    completed.append(task_copy)
+        for date, task in self.index.completed_tasks(keyword, tag, limit, offset, newest_first):
+            task_copy = task.copy()
+            task_copy['due'] = date
+            task_copy['complete'] = True
+            completed.append(task_copy)
         return completed
+
+    def get_completed_tags(self):
+        return self.index.completed_tags()
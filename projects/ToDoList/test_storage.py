@@ -0,0 +1,72 @@
+import os
+
+from logic.task_index import TaskIndex
+from utils import storage
+from utils.storage import JournalStore
+
+
+def task(task_id, title, due='2024-02-05'):
+    return {'id': task_id, 'title': title, 'due': due, 'tag': '', 'description': '', 'complete': False}
+
+
+def titles(tasks):
+    return sorted(task['title'] for task in tasks)
+
+
+def test_journal_is_replayed_on_load(tmp_path):
+    store = JournalStore(str(tmp_path / 'tasks.json'))
+    store.put(task(1, 'a'))
+    store.put(task(2, 'b'))
+    store.put(task(1, 'a renamed'))
+    store.delete(2)
+    store.close()
+
+    reloaded = JournalStore(str(tmp_path / 'tasks.json'))
+    assert titles(reloaded.load()) == ['a renamed']
+    assert reloaded.journal_entries == 4
+
+
+def test_line_cut_short_is_dropped_and_appending_continues(tmp_path):
+    store = JournalStore(str(tmp_path / 'tasks.json'))
+    store.put(task(1, 'a'))
+    store.close()
+    with open(store.journal_filename, 'a') as f:
+        f.write('{"op": "put", "task": {"id": 2, "ti')
+
+    store = JournalStore(str(tmp_path / 'tasks.json'))
+    assert titles(store.load()) == ['a']
+    store.put(task(3, 'c'))
+    store.close()
+
+    assert titles(JournalStore(str(tmp_path / 'tasks.json')).load()) == ['a', 'c']
+
+
+def test_compaction_writes_a_snapshot_and_removes_the_journal(tmp_path, monkeypatch):
+    # The snapshot's directory entry must be synced before the journal goes
+    events = []
+    fsync_directory, remove = storage._fsync_directory, os.remove
+
+    def record_fsync(path):
+        events.append(('fsync', path))
+        fsync_directory(path)
+
+    def record_remove(path):
+        events.append(('remove', path))
+        remove(path)
+
+    monkeypatch.setattr(storage, '_fsync_directory', record_fsync)
+    monkeypatch.setattr(os, 'remove', record_remove)
+
+    store = JournalStore(str(tmp_path / 'tasks.json'))
+    index = TaskIndex()
+    for task_id, title in [(1, 'a'), (2, 'b')]:
+        index.add(task(task_id, title))
+        store.put(index.get(task_id))
+    store.compact(index)
+    store.close()
+
+    assert events == [('fsync', str(tmp_path)), ('remove', store.journal_filename)]
+    assert not os.path.exists(store.journal_filename)
+    reloaded = JournalStore(str(tmp_path / 'tasks.json'))
+    assert titles(reloaded.load()) == ['a', 'b']
+    assert reloaded.journal_entries == 0
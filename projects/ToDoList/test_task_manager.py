@@ -0,0 +1,44 @@
+import pytest
+
+from logic.task_manager import TaskManager
+from utils.storage import SqliteStore
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = TaskManager(str(tmp_path / 'tasks.json'))
+    yield manager
+    manager.storage.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SqliteStore(str(tmp_path / 'tasks.sqlite'))
+    yield store
+    store.close()
+
+
+def test_occurrences_keep_their_own_task(manager):
+    manager.add_task('weekly', '2024-02-05', 'a', '', True)
+    manager.add_task('new task', '2024-02-07', 'a', '', True, 'FREQ=WEEKLY;INTERVAL=2;BYDAY=WE')
+    occurrences = [(date, task['title']) for date, task in manager.get_occurrences('2024-02-01', '2024-03-31')]
+    assert occurrences == [
+        ('2024-02-05', 'weekly'), ('2024-02-07', 'new task'), ('2024-02-12', 'weekly'),
+        ('2024-02-19', 'weekly'), ('2024-02-21', 'new task'), ('2024-02-26', 'weekly'),
+        ('2024-03-04', 'weekly'), ('2024-03-06', 'new task'), ('2024-03-11', 'weekly'),
+        ('2024-03-18', 'weekly'), ('2024-03-20', 'new task'), ('2024-03-25', 'weekly'),
+    ]
+
+
+def test_empty_sqlite_store_is_used(store):
+    manager = TaskManager(storage=store)
+    assert manager.storage is store
+
+
+def test_adding_a_task_to_sqlite_is_one_transaction(store):
+    manager = TaskManager(storage=store)
+    statements = []
+    store.conn.set_trace_callback(statements.append)
+    task_id = manager.add_task('write report', '2024-02-05', 'work', '')
+    assert statements.count('COMMIT') == 1
+    assert store.get(task_id)['id'] == task_id
@@ -2,6 +2,8 @@ from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QCalendarWidget,
 from PyQt5.QtCore import QDate, Qt
 from ui.task_dialog import TaskDialog
 from logic.task_manager import TaskManager
+from logic.task_index import is_pending
+from utils.storage import open_storage
 from ui.task_detail_dialog import TaskDetailDialog
 
 class MainWindow(QMainWindow):
@@ -10,7 +12,8 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("To-Do Calendar")
         self.setGeometry(100, 100, 1000, 600)
 
-        self.task_manager = TaskManager()
+        self.task_manager = TaskManager(storage=open_storage())
+        self.history_page_size = 200
 
         self.tabs = QTabWidget()
 
@@ -36,6 +39,7 @@ class MainWindow(QMainWindow):
 
         self.task_list = QListWidget()
         self.task_list.itemDoubleClicked.connect(self.show_task_details)
+        self.task_list.itemChanged.connect(self.mark_complete)
 
         self.add_task_button = QPushButton("Add Task")
         self.add_task_button.clicked.connect(self.open_task_dialog)
@@ -70,27 +74,28 @@ class MainWindow(QMainWindow):
         self.history_list = QListWidget()
         self.history_list.itemDoubleClicked.connect(self.show_task_details_from_history)
 
+        self.more_history_button = QPushButton("Show More")
+        self.more_history_button.clicked.connect(self.load_more_completed_tasks)
+
         self.history_layout.addWidget(QLabel("Completed Tasks:"))
         self.history_layout.addWidget(self.history_filter_input)
         self.history_layout.addWidget(self.tag_filter)
         self.history_layout.addWidget(self.history_list)
+        self.history_layout.addWidget(self.more_history_button)
         self.load_completed_tasks()
 
     def update_tag_filter(self):
         self.tag_filter.clear()
         self.tag_filter.addItem("All Tags")
-        completed_tasks = self.task_manager.get_completed_tasks()
-        tags = sorted(set([t['tag'] for t in completed_tasks]))
-        self.tag_filter.addItems(tags)
+        self.tag_filter.addItems(self.task_manager.get_completed_tags())
 
     def load_tasks_for_selected_date(self, date):
         self.task_list.clear()
-        self.calendar.update()
         date_str = date.toString("yyyy-MM-dd")
         self.current_date = date_str
         tasks = self.task_manager.get_tasks_by_date(date_str)
         for task in tasks:
-            if (not task.get("repeat") and not task.get("complete")) or (task.get("repeat") and date_str not in task.get("completed_dates", [])):
+            if is_pending(task, date_str):
                 start = task.get('start', 'N/A')
                 end = task.get('end', 'N/A')
                 item = QListWidgetItem(f"[{task['tag']}] {task['title']} ({start} - {end})")
@@ -98,7 +103,6 @@ class MainWindow(QMainWindow):
                 item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
                 item.setCheckState(Qt.Unchecked)
                 self.task_list.addItem(item)
-        self.task_list.itemChanged.connect(self.mark_complete)
 
     def open_task_dialog(self):
         selected_date = self.calendar.selectedDate()
@@ -111,12 +115,12 @@ class MainWindow(QMainWindow):
 
     def mark_complete(self, item):
         text = item.text()
-        if not text:
+        # itemChanged also fires for tooltip edits; only a ticked box completes the task
+        if not text or item.checkState() != Qt.Checked:
             return
         date = self.calendar.selectedDate().toString("yyyy-MM-dd")
         title = text.split(']')[1].split('(')[0].strip()
         self.task_manager.set_task_completion(date, title, True)
-        self.task_manager.save_tasks()
         self.task_list.takeItem(self.task_list.row(item))
         self.calendar.update()
         self.load_completed_tasks()
@@ -132,22 +136,29 @@ class MainWindow(QMainWindow):
 
     def load_completed_tasks(self):
         self.history_list.clear()
-        keyword = self.history_filter_input.text().lower()
+        self.history_loaded = 0
+        self.load_more_completed_tasks()
+
+    def load_more_completed_tasks(self):
+        # Newest first, one page at a time
+        keyword = self.history_filter_input.text()
         selected_tag = self.tag_filter.currentText()
-        for task in self.task_manager.get_completed_tasks():
-            if (keyword in task['title'].lower()) and (selected_tag == "All Tags" or task['tag'] == selected_tag):
-                start = task.get('start', 'N/A')
-                end = task.get('end', 'N/A')
-                item = QListWidgetItem(f"{task['due']} - {task['title']} [{task['tag']}] ({start} - {end})")
-                item.setToolTip(task.get("description", ""))
-                self.history_list.addItem(item)
+        tag = None if selected_tag in ("All Tags", "") else selected_tag
+        tasks = self.task_manager.get_completed_tasks(keyword, tag, limit=self.history_page_size,
+                                                      offset=self.history_loaded, newest_first=True)
+        for task in tasks:
+            start = task.get('start', 'N/A')
+            end = task.get('end', 'N/A')
+            item = QListWidgetItem(f"{task['due']} - {task['title']} [{task['tag']}] ({start} - {end})")
+            item.setToolTip(task.get("description", ""))
+            self.history_list.addItem(item)
+        self.history_loaded += len(tasks)
+        self.more_history_button.setEnabled(len(tasks) == self.history_page_size)
 
     def paint_calendar_cell(self, painter, rect, date):
         from PyQt5.QtGui import QColor, QBrush
         QCalendarWidget.paintCell(self.calendar, painter, rect, date)
-        date_str = date.toString("yyyy-MM-dd")
-        tasks = self.task_manager.get_tasks_by_date(date_str)
-        if any((not t.get("repeat") and not t.get("complete")) or (t.get("repeat") and date_str not in t.get("completed_dates", [])) for t in tasks):
+        if self.task_manager.is_busy_day(date.year(), date.month(), date.day()):
             painter.save()
             painter.setBrush(QBrush(QColor(200, 230, 201, 150)))
             painter.drawRect(rect)
@@ -164,7 +175,7 @@ class MainWindow(QMainWindow):
                 detail_dialog = TaskDetailDialog(task, self)
                 if detail_dialog.exec_():
                     task['description'] = detail_dialog.get_description()
-                    self.task_manager.save_tasks()
+                    self.task_manager.update_task(task)
                     item.setToolTip(task.get("description", ""))
                 break
 
@@ -172,8 +183,8 @@ class MainWindow(QMainWindow):
         text = item.text()
         if not text:
             return
-        title = text.split('-')[1].split('[')[0].strip()
-        for task in self.task_manager.get_completed_tasks():
+        title = text.split(' - ', 1)[1].split('[')[0].strip()
+        for task in self.task_manager.get_completed_tasks(keyword=title):
             if task['title'] == title:
                 detail_dialog = TaskDetailDialog(task, self)
                 detail_dialog.exec_()
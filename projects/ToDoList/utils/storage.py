@@ -0,0 +1,299 @@
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from logic.recurrence import completion_dates, normalize_task
+from logic.task_index import TaskIndex, occurring_on
+
+
+def _fsync_directory(path):
+    # Directories cannot be opened for fsync on Windows; there the rename is durable already
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class JournalStore:
+    # tasks.json holds a snapshot ({date: [task, ...]}) and tasks.json.journal the mutations
+    # made since, one JSON line each. Replaying a line twice has the same effect as once,
+    # so a crash at any point leaves a state that loads cleanly.
+    def __init__(self, filename='tasks.json'):
+        self.filename = filename
+        self.journal_filename = filename + '.journal'
+        self.journal = None
+        self.journal_entries = 0
+
+    def make_index(self):
+        # Everything is held in memory and indexed there
+        return TaskIndex()
+
+    def load(self):
+        tasks = {}
+        if os.path.exists(self.filename):
+            with open(self.filename, 'r') as f:
+                for date, task_list in json.load(f).items():
+                    for task in task_list:
+                        task.setdefault('due', date)
+                        tasks[task.get('id', id(task))] = task
+        self.journal_entries = 0
+        if os.path.exists(self.journal_filename):
+            with open(self.journal_filename, 'rb+') as f:
+                good_end = 0
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        entry = None
+                    if entry is None or not line.endswith(b'\n'):
+                        # A line cut short by a crash: drop it so new entries are not appended after it
+                        f.truncate(good_end)
+                        break
+                    if entry['op'] == 'put':
+                        tasks[entry['task']['id']] = entry['task']
+                    elif entry['op'] == 'delete':
+                        tasks.pop(entry['id'], None)
+                    self.journal_entries += 1
+                    good_end += len(line)
+        return list(tasks.values())
+
+    def _append(self, entry):
+        if self.journal is None:
+            self.journal = open(self.journal_filename, 'a')
+        self.journal.write(json.dumps(entry) + '\n')
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.journal_entries += 1
+
+    def put(self, task):
+        self._append({'op': 'put', 'task': task})
+
+    def delete(self, task_id):
+        self._append({'op': 'delete', 'id': task_id})
+
+    def needs_compaction(self, index):
+        # Compacting costs one full write, so doing it once the journal is as long as the
+        # task list (and at least 1000 entries) keeps each mutation O(1) I/O on average
+        return self.journal_entries >= max(1000, len(index))
+
+    def compact(self, index):
+        tasks_by_date = {date: index.stored_on(date) for date in index.dates()}
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'w') as f:
+            json.dump(tasks_by_date, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        # The rename is atomic: readers see either the old snapshot or the new one, never half of one
+        os.replace(temp_filename, self.filename)
+        # The rename must reach the disk before the journal is removed, or a crash could
+        # leave the old snapshot without the journal that brings it up to date
+        _fsync_directory(os.path.dirname(os.path.abspath(self.filename)))
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if os.path.exists(self.journal_filename):
+            os.remove(self.journal_filename)
+        self.journal_entries = 0
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+
+class SqliteStore:
+    # Tasks live in SQLite and are read on demand: a day's tasks come from a cached
+    # one-month query, history comes a page at a time. It acts as its own index.
+    # Repeat tasks (rule set) are few, so they are kept in memory and expanded per day;
+    # the completions table has a row per completed occurrence for the history.
+    # sqlite3 keeps compiled statements in a per-connection cache, so the fixed,
+    # parameterized queries below are prepared once and reused.
+    def __init__(self, filename='tasks.sqlite', cached_months=3):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.cached_months = cached_months
+        self.months = OrderedDict()
+        self.repeat_tasks = None
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                due TEXT NOT NULL,
+                title TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                done INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                rule TEXT);
+            CREATE TABLE IF NOT EXISTS completions (
+                task_id INTEGER NOT NULL,
+                due TEXT NOT NULL,
+                PRIMARY KEY (task_id, due));
+            CREATE INDEX IF NOT EXISTS idx_completions_due ON completions (due, task_id);
+            CREATE INDEX IF NOT EXISTS idx_tasks_due_title ON tasks (due, title);
+            CREATE INDEX IF NOT EXISTS idx_tasks_tag_done ON tasks (tag, done, due);
+            CREATE INDEX IF NOT EXISTS idx_tasks_repeat ON tasks (id) WHERE rule IS NOT NULL;
+        """)
+
+    def make_index(self):
+        return self
+
+    def load(self):
+        return []
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def _write(self, task):
+        # Inserts or replaces the task and its completions; the caller commits
+        normalize_task(task)
+        if task.get('id') is None:
+            # Take the next id first so the stored JSON carries it
+            task['id'] = self.conn.execute(
+                "INSERT INTO tasks (due, title, tag, done, data) VALUES (?, ?, ?, 0, '')",
+                (task['due'], task['title'], task['tag'])).lastrowid
+        dates = completion_dates(task)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO tasks (id, due, title, tag, done, data, rule) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (task['id'], task['due'], task['title'], task['tag'], int(bool(dates)), json.dumps(task), task.get('rrule')))
+        self.conn.execute("DELETE FROM completions WHERE task_id = ?", (task['id'],))
+        self.conn.executemany("INSERT INTO completions (task_id, due) VALUES (?, ?)",
+                              ((task['id'], date) for date in dates))
+
+    def _forget(self, task):
+        if task.get('repeat'):
+            self.repeat_tasks = None
+        else:
+            self.months.pop(task['due'][:7], None)
+
+    def add(self, task):
+        with self.conn:
+            self._write(task)
+        self._forget(task)
+        return task['id']
+
+    def put(self, task):
+        # The stored JSON is rewritten whole anyway, so put is an upsert
+        with self.conn:
+            self._write(task)
+        self._forget(task)
+
+    def remove(self, task_id):
+        # Nothing is held in memory to drop, so this only returns the task; the row
+        # is deleted by delete(), which TaskManager calls right after
+        return self.get(task_id)
+
+    def delete(self, task_id):
+        task = self.get(task_id)
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            self.conn.execute("DELETE FROM completions WHERE task_id = ?", (task_id,))
+        if task is not None:
+            self._forget(task)
+
+    def refresh_completion(self, task_id):
+        # Completions are written by put() along with the rest of the task
+        pass
+
+    def get(self, task_id):
+        row = self.conn.execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def month(self, month):
+        # month is 'yyyy-MM'; returns {date: [task, ...]} for it, from one range query
+        if month in self.months:
+            self.months.move_to_end(month)
+            return self.months[month]
+        days = {}
+        rows = self.conn.execute(
+            "SELECT due, data FROM tasks WHERE rule IS NULL AND due >= ? AND due < ? ORDER BY due, id",
+            (month + '-00', month + '-99'))
+        for due, data in rows:
+            days.setdefault(due, []).append(json.loads(data))
+        self.months[month] = days
+        if len(self.months) > self.cached_months:
+            self.months.popitem(last=False)
+        return days
+
+    def repeating(self):
+        if self.repeat_tasks is None:
+            self.repeat_tasks = [json.loads(data) for (data,) in self.conn.execute(
+                "SELECT data FROM tasks WHERE rule IS NOT NULL ORDER BY id")]
+        return self.repeat_tasks
+
+    def on_date(self, date):
+        return self.month(date[:7]).get(date, []) + occurring_on(self.repeating(), date)
+
+    def find(self, date, title):
+        ids = [row[0] for row in self.conn.execute(
+            "SELECT id FROM tasks WHERE due = ? AND title = ? AND rule IS NULL ORDER BY id", (date, title))]
+        return ids + [task['id'] for task in occurring_on(self.repeating(), date, title)]
+
+    def with_tag(self, tag):
+        return {row[0] for row in self.conn.execute("SELECT id FROM tasks WHERE tag = ?", (tag,))}
+
+    def completed_tasks(self, keyword='', tag=None, limit=None, offset=0, newest_first=False):
+        query = "SELECT c.due, t.data FROM completions c JOIN tasks t ON t.id = c.task_id WHERE 1"
+        params = []
+        if tag is not None:
+            query += " AND t.tag = ?"
+            params.append(tag)
+        # Same matching as TaskIndex: each keyword word starts a word of the title
+        for part in keyword.lower().split():
+            query += " AND (' ' || lower(t.title)) LIKE ? ESCAPE '\\'"
+            params.append('% ' + part.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        query += " ORDER BY c.due DESC, c.task_id DESC" if newest_first else " ORDER BY c.due, c.task_id"
+        query += " LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        return [(due, json.loads(data)) for due, data in self.conn.execute(query, params)]
+
+    def completed_tags(self):
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT t.tag FROM completions c JOIN tasks t ON t.id = c.task_id ORDER BY t.tag")]
+
+    def dates(self):
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT due FROM tasks ORDER BY due")]
+
+    def needs_compaction(self, index):
+        return False
+
+    def compact(self, index):
+        # Every change is already committed
+        pass
+
+    def close(self):
+        self.conn.close()
+
+
+def migrate_json_to_sqlite(json_filename='tasks.json', db_filename='tasks.sqlite'):
+    # Imports tasks.json (and any journal next to it) into a new SQLite database, keeping task ids
+    if os.path.exists(db_filename):
+        raise FileExistsError(f"{db_filename} already exists")
+    tasks = JournalStore(json_filename).load()
+    index = TaskIndex()
+    for task in tasks:
+        index.add(task)
+    store = SqliteStore(db_filename)
+    with store.conn:
+        for task in index.tasks.values():
+            store._write(task)
+    store.close()
+    return len(index)
+
+
+def open_storage(json_filename='tasks.json', db_filename='tasks.sqlite'):
+    # Once tasks.json has been migrated, the SQLite database is used
+    if os.path.exists(db_filename):
+        return SqliteStore(db_filename)
+    return JournalStore(json_filename)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Migrate the to-do list from tasks.json to SQLite.")
+    parser.add_argument('json_file', nargs='?', default='tasks.json')
+    parser.add_argument('db_file', nargs='?', default='tasks.sqlite')
+    args = parser.parse_args()
+    count = migrate_json_to_sqlite(args.json_file, args.db_file)
+    print(f"Migrated {count} tasks from {args.json_file} to {args.db_file}")